@@ -0,0 +1,26 @@
+'''Подготовка окружения Django для скриптов замеров.
+
+Скрипты запускаются из корня репозитория и работают с временной
+базой в памяти, не трогая db.sqlite3.
+'''
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup():
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
@@ -0,0 +1,63 @@
+'''Сколько байт данных постов выбирает одна страница ленты.
+
+Сравнивает запрос ленты с полным текстом постов и запрос с отложенным
+полем text, где карточке достаточно сохранённого анонса.
+
+    python benchmarks/feed_bytes.py [--posts 200] [--words 800]
+'''
+import argparse
+
+import _django
+
+
+def fetched_bytes(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(
+            len(str(value).encode()) for row in cursor.fetchall()
+            for value in row if value is not None
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--words', type=int, default=800)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Post
+    from blog.views import IndexListView
+
+    author = get_user_model().objects.create(username='bench')
+    category = Category.objects.create(
+        title='Замеры', description='Замеры', slug='bench'
+    )
+    text = ' '.join(['слово'] * args.words)
+    for number in range(args.posts):
+        Post.objects.create(
+            title=f'Пост {number}', text=text, author=author,
+            category=category, pub_date=timezone.now(),
+        )
+
+    view = IndexListView()
+    view.kwargs = {}
+    page_size = view.paginate_by
+    feed = view.get_queryset()
+    rows = (
+        ('весь текст поста', fetched_bytes(feed.defer(None)[:page_size])),
+        ('анонс, text отложен', fetched_bytes(feed[:page_size])),
+    )
+    print(f'Страница ленты: {page_size} постов по {args.words} слов')
+    for name, size in rows:
+        print(f'{name:<24}{size:>12} байт')
+
+
+if __name__ == '__main__':
+    main()
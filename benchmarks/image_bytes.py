@@ -0,0 +1,83 @@
+'''Сколько байт изображений загружает одна страница ленты.
+
+Сравнивает исходные фото, копии «card» в JPEG и те же копии в WebP,
+которые выбирает браузер с поддержкой WebP.
+
+    python benchmarks/image_bytes.py [--size 3000x2000]
+'''
+import argparse
+import tempfile
+from io import BytesIO
+
+import _django
+
+
+def photo(width, height):
+    '''Фото с плавными переходами и шумом, похожее на снимок камеры.'''
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from PIL import Image, ImageFilter
+
+    image = Image.merge('RGB', (
+        Image.linear_gradient('L').resize((width, height)),
+        Image.effect_noise((width, height), 40).filter(
+            ImageFilter.GaussianBlur(2)
+        ),
+        Image.radial_gradient('L').resize((width, height)),
+    ))
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=92)
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', default='3000x2000')
+    args = parser.parse_args()
+    width, height = map(int, args.size.split('x'))
+
+    _django.setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.files.storage import default_storage
+    from django.utils import timezone
+
+    from blog.images import rendition_name
+    from blog.models import Category, Post
+    from blog.views import IndexListView
+
+    media = tempfile.TemporaryDirectory()
+    settings.MEDIA_ROOT = media.name
+    settings.BLOG_JOBS_EAGER = True
+    author = get_user_model().objects.create(username='bench')
+    category = Category.objects.create(
+        title='Замеры', description='Замеры', slug='bench'
+    )
+    view = IndexListView()
+    view.kwargs = {}
+    page_size = view.paginate_by
+    for number in range(page_size):
+        Post.objects.create(
+            title=f'Пост {number}', text='Текст', author=author,
+            category=category, pub_date=timezone.now(),
+            image=photo(width, height),
+        )
+
+    names = [post.image.name for post in view.get_queryset()[:page_size]]
+    rows = (
+        ('исходные фото', names),
+        ('копии card, JPEG', [
+            rendition_name(name, 'card') for name in names
+        ]),
+        ('копии card, WebP', [
+            rendition_name(name, 'card', webp=True) for name in names
+        ]),
+    )
+    print(f'Страница ленты: {page_size} постов с фото {args.size}')
+    for title, files in rows:
+        size = sum(default_storage.size(name) for name in files)
+        print(f'{title:<20}{size:>12} байт')
+    media.cleanup()
+
+
+if __name__ == '__main__':
+    main()
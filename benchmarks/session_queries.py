@@ -0,0 +1,61 @@
+'''Сколько SQL-запросов тратит авторизованный запрос на сессию.
+
+Для каждого движка сессий выполняет одинаковые запросы к ленте от
+имени вошедшего пользователя и считает запросы к django_session и
+запросы всего.
+
+    python benchmarks/session_queries.py [--requests 20]
+'''
+import argparse
+
+import _django
+
+ENGINES = ('db', 'cached_db', 'signed_cookies')
+
+
+def measure(engine, user, requests):
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[engine]):
+        client = Client()
+        client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                client.get('/')
+    session = sum('django_session' in query['sql'] for query in queries)
+    return session / requests, len(queries) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    _django.setup()
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Post
+
+    user = get_user_model().objects.create(username='bench')
+    category = Category.objects.create(
+        title='Замеры', description='Замеры', slug='bench'
+    )
+    for number in range(20):
+        Post.objects.create(
+            title=f'Пост {number}', text='Текст', author=user,
+            category=category, pub_date=timezone.now(),
+        )
+
+    print(f'Запросов к ленте от вошедшего пользователя: {args.requests}')
+    print(f'{"движок":<16}{"к сессиям":>12}{"всего":>10}')
+    for engine in ENGINES:
+        session, total = measure(engine, user, args.requests)
+        print(f'{engine:<16}{session:>12.1f}{total:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
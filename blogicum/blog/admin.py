@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import Category, Comment, Location, Post
+from .images import RENDITIONS, rendition_size, rendition_url
+from .models import Category, Comment, Job, Location, Post
 
 
 class PostInline(admin.StackedInline):
@@ -45,8 +46,15 @@ class PostAdmin(admin.ModelAdmin):
 
     def image_tag(self, obj):
         if obj.image:
-            return format_html('''<img src="{}" width="100"
-                               height="100" />''', obj.image.url)
+            width, height = RENDITIONS['admin-thumb']
+            if obj.image_width and obj.image_height:
+                width, height = rendition_size(
+                    obj.image_width, obj.image_height, 'admin-thumb'
+                )
+            return format_html('''<img src="{}" width="{}"
+                               height="{}" loading="lazy" />''',
+                               rendition_url(obj, 'admin-thumb'),
+                               width, height)
         else:
             return None
 
@@ -61,3 +69,30 @@ class LocationAdmin(admin.ModelAdmin):
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_after',
+        'duration',
+        'finished_at',
+    )
+    list_filter = ('status', 'name')
+    # Аргументы задач могут содержать личные данные пользователей.
+    exclude = ('payload',)
+    readonly_fields = (
+        'name',
+        'status',
+        'attempts',
+        'max_attempts',
+        'run_after',
+        'created_at',
+        'started_at',
+        'finished_at',
+        'duration',
+        'last_error',
+    )
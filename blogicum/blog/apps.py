@@ -6,3 +6,6 @@ class BlogConfig(AppConfig):
     name = 'blog'
 
     verbose_name = 'Блог'
+
+    def ready(self):
+        from blog import signals, tasks  # noqa: F401
@@ -0,0 +1,36 @@
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Post
+from blog.page_cache import invalidate_pages, post_tags
+from blog.post_cache import forget_posts
+
+
+def backfill_posts(queryset, fields, fill, batch_size):
+    '''Заполняет поля fields публикаций queryset пачками по batch_size.
+
+    fill(post) выставляет поля публикации и возвращает False, если её
+    нужно пропустить. Каждая пачка сохраняется одним bulk_update вместе
+    с версией поста, после чего сбрасываются кеши постов и страниц.
+    Возвращает количество обновлённых публикаций.
+    '''
+    queryset = queryset.order_by('id')
+    fields = (*fields, 'version', 'updated_at')
+    updated = 0
+    last_id = 0
+    now = timezone.now()
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        ready = [post for post in batch if fill(post) is not False]
+        for post in ready:
+            post.version = F('version') + 1
+            post.updated_at = now
+        Post.objects.bulk_update(ready, fields)
+        ids = [post.id for post in ready]
+        forget_posts(ids)
+        invalidate_pages(post_tags(ids))
+        updated += len(ready)
+    return updated
@@ -0,0 +1,160 @@
+import hashlib
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Кеш страниц. Если он общий для процессов сервера, в нём же хранится
+# всё, что должно меняться для всех процессов сразу.
+PAGE_CACHE = 'pages'
+VERSION_KEY = 'blog:version:{}'
+LOCK_KEY = '{}:lock'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _initial_version():
+    '''Начальное значение версии берётся из часов.
+
+    После вытеснения счётчика из кеша новая версия не совпадёт ни с одной
+    из уже использованных.
+    '''
+    return time.time_ns()
+
+
+def get_version(name, using='default'):
+    '''Текущая версия группы кешированных данных.'''
+    return get_versions((name,), using)[name]
+
+
+def get_versions(names, using='default'):
+    '''Версии нескольких групп за одно обращение к кешу.'''
+    cache = caches[using]
+    keys = {VERSION_KEY.format(name): name for name in names}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    missing = {
+        key: _initial_version() for key, name in keys.items()
+        if name not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update({keys[key]: value for key, value in missing.items()})
+    return versions
+
+
+def bump_version(name, using='default'):
+    '''Инвалидирует группу данных, меняя её версию.'''
+    cache = caches[using]
+    key = VERSION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, None)
+        return version
+
+
+def bump_versions(names, using='default'):
+    for name in names:
+        bump_version(name, using)
+
+
+def versioned_key(prefix, tags, *parts, using='default'):
+    '''Ключ, который меняется при инвалидации любой из меток.'''
+    versions = get_versions(tags, using)
+    raw = '|'.join(
+        [*parts, *(f'{tag}={versions[tag]}' for tag in sorted(versions))]
+    )
+    return f'{prefix}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def increment(key, using='default'):
+    cache = caches[using]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def read_entry(key, using='default', beta=None):
+    '''Значение записи store_entry() и признак того, что оно свежее.
+
+    Запись считается устаревшей чуть раньше срока, со случайным сдвигом
+    пропорционально времени её расчёта (вероятностное досрочное
+    истечение): пересчёт горячего ключа достаётся одному запросу, а не
+    всем сразу. Если записи нет, возвращает (None, False).
+    '''
+    entry = caches[using].get(key)
+    if entry is None:
+        return None, False
+    value, expires_at, delta = entry
+    if beta is None:
+        beta = settings.BLOG_CACHE_EARLY_EXPIRY_BETA
+    early = -delta * beta * math.log(1.0 - random.random())
+    return value, time.time() + early < expires_at
+
+
+def store_entry(key, value, timeout, delta=0, using='default'):
+    '''Сохраняет значение, свежее timeout секунд.
+
+    Ещё BLOG_CACHE_STALE_TIMEOUT секунд запись отдаётся устаревшей, пока
+    один запрос её пересчитывает. delta — время расчёта в секундах.
+    '''
+    caches[using].set(
+        key,
+        (value, time.time() + timeout, delta),
+        timeout + settings.BLOG_CACHE_STALE_TIMEOUT,
+    )
+
+
+def acquire_lock(key, using='default'):
+    '''Право пересчитать запись получает только один запрос.'''
+    return caches[using].add(
+        LOCK_KEY.format(key), True, settings.BLOG_CACHE_LOCK_TIMEOUT
+    )
+
+
+def release_lock(key, using='default'):
+    caches[using].delete(LOCK_KEY.format(key))
+
+
+def wait_for_entry(key, using='default'):
+    '''Ждёт значение, которое рассчитывает владелец блокировки.
+
+    Возвращает None, если оно не появилось за BLOG_CACHE_LOCK_WAIT секунд.
+    '''
+    deadline = time.monotonic() + settings.BLOG_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value, _ = read_entry(key, using, beta=0)
+        if value is not None:
+            return value
+    return None
+
+
+def get_or_compute(key, compute, timeout, using='default'):
+    '''Значение из кеша с защитой от одновременного пересчёта.
+
+    Истёкшую запись пересчитывает один запрос, остальные получают
+    прежнее значение, а если его нет, ждут результат.
+    '''
+    value, fresh = read_entry(key, using)
+    if fresh:
+        return value
+    locked = acquire_lock(key, using)
+    if not locked:
+        if value is None:
+            value = wait_for_entry(key, using)
+        if value is not None:
+            return value
+    try:
+        started = time.monotonic()
+        value = compute()
+        store_entry(key, value, timeout, time.monotonic() - started, using)
+    finally:
+        if locked:
+            release_lock(key, using)
+    return value
@@ -0,0 +1,46 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+from blog.page_cache import invalidate_pages, post_tags
+from blog.post_cache import forget_posts
+
+
+def _actual_comment_count():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def recount_comment_counts():
+    '''Исправляет расходящиеся счётчики комментариев одним UPDATE.
+
+    Возвращает количество исправленных публикаций.
+    '''
+    stale = Post.objects.annotate(actual=_actual_comment_count()).exclude(
+        comment_count=F('actual')
+    )
+    return recount_post_comments(list(stale.values_list('pk', flat=True)))
+
+
+def recount_post_comments(post_ids):
+    '''Пересчитывает счётчики комментариев постов post_ids.
+
+    Сбрасывает кеши этих постов и их страниц. Возвращает количество
+    обновлённых публикаций.
+    '''
+    if not post_ids:
+        return 0
+    repaired = Post.objects.filter(pk__in=post_ids).touch(
+        comment_count=_actual_comment_count()
+    )
+    forget_posts(post_ids)
+    invalidate_pages(post_tags(post_ids))
+    return repaired
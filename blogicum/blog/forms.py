@@ -1,5 +1,12 @@
 from django import forms
+from django.conf import settings
+from django.contrib.auth.forms import PasswordResetForm
+from django.core.files.uploadedfile import UploadedFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
+from .images import compress_upload
+from .jobs import enqueue
 from .models import Comment, Post, User
 
 
@@ -15,18 +22,65 @@ class UserForm(forms.ModelForm):
         )
 
 
+def upload_too_large_error():
+    return forms.ValidationError(
+        'Файл больше %s.' % filesizeformat(settings.BLOG_MAX_UPLOAD_SIZE)
+    )
+
+
+class PostImageField(forms.ImageField):
+    '''Поле фото, которое отклоняет большой файл, не открывая его.
+
+    Обычно такой файл до формы не доходит: его загрузку прерывает
+    обработчик из blog.uploads.
+    '''
+
+    def to_python(self, data):
+        if data and data.size > settings.BLOG_MAX_UPLOAD_SIZE:
+            raise upload_too_large_error()
+        return super().to_python(data)
+
+
 class PostForm(forms.ModelForm):
     '''Модель формы для поста.'''
 
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': PostImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local',
                                                    'class': 'form-control'},
                                             format='%Y-%m-%dT%H:%M')
         }
 
+    def __init__(self, *args, rejected_uploads=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rejected_uploads = rejected_uploads
+
+    def clean(self):
+        '''Отмечает поля, загрузку файлов которых прервал сервер.'''
+        cleaned_data = super().clean()
+        for field in self.rejected_uploads:
+            self.add_error(field, upload_too_large_error())
+        return cleaned_data
+
+    def clean_image(self):
+        '''Ограничивает число пикселей фото и пересжимает его.'''
+        image = self.cleaned_data.get('image')
+        if not isinstance(image, UploadedFile):
+            return image
+        width, height = image.image.size
+        if width * height > settings.BLOG_MAX_UPLOAD_PIXELS:
+            raise forms.ValidationError(
+                'Фото больше %d мегапикселей.'
+                % (settings.BLOG_MAX_UPLOAD_PIXELS // 1_000_000)
+            )
+        try:
+            return compress_upload(image)
+        except (OSError, Image.DecompressionBombError):
+            raise forms.ValidationError('Не удалось обработать фото.')
+
 
 class CommentForm(forms.ModelForm):
     '''Модель формы для комментария.'''
@@ -37,3 +91,27 @@ class CommentForm(forms.ModelForm):
         widgets = {
             'text': forms.Textarea({'cols': '22', 'rows': '5'})
         }
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    '''Форма сброса пароля, письмо которой отправляет фоновая задача.
+
+    В очередь попадают только id пользователя и шаблоны: ссылку со
+    свежим токеном собирает задача, и в таблице задач её не видно.
+    '''
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        enqueue(
+            'send_password_reset',
+            user_id=context['user'].pk,
+            email=to_email,
+            domain=context['domain'],
+            site_name=context['site_name'],
+            protocol=context['protocol'],
+            from_email=from_email,
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            html_email_template_name=html_email_template_name,
+        )
@@ -0,0 +1,79 @@
+'''Личные фрагменты страниц, кешируемых общими для всех пользователей.
+
+В кешируемой странице на месте такого фрагмента остаётся метка с его
+именем и аргументами. При выдаче страницы метки заменяются фрагментами,
+отрисованными для текущего пользователя без обращения к базе.
+'''
+import json
+import re
+from html import unescape
+
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from blog.forms import CommentForm
+
+MARKER = '<!--hole:{}:{}-->'
+MARKER_RE = re.compile(r'<!--hole:(\w+):(\{[^>]*\})-->')
+
+renderers = {}
+
+
+def hole(name):
+    '''Регистрирует функцию отрисовки фрагмента: (request, **kwargs).'''
+    def register(renderer):
+        renderers[name] = renderer
+        return renderer
+    return register
+
+
+def render_hole(request, name, kwargs):
+    return renderers[name](request, **kwargs)
+
+
+def punch_hole(name, kwargs):
+    '''Метка фрагмента; аргументы должны сериализоваться в JSON.'''
+    return MARKER.format(name, escape(json.dumps(kwargs)))
+
+
+def fill_holes(request, content):
+    '''Заменяет метки фрагментами для пользователя из request.'''
+    def fill(match):
+        kwargs = json.loads(unescape(match.group(2)))
+        return render_hole(request, match.group(1), kwargs)
+    return MARKER_RE.sub(fill, content)
+
+
+@hole('header')
+def header(request):
+    return render_to_string('includes/header.html', request=request)
+
+
+@hole('comment_form')
+def comment_form(request, post_id):
+    if not request.user.is_authenticated:
+        return ''
+    return render_to_string(
+        'includes/comment_form.html',
+        {'form': CommentForm(), 'post_id': post_id},
+        request=request,
+    )
+
+
+@hole('post_owner_links')
+def post_owner_links(request, post_id, author_id):
+    if request.user.id != author_id:
+        return ''
+    return render_to_string(
+        'includes/post_owner_links.html', {'post_id': post_id}
+    )
+
+
+@hole('comment_owner_links')
+def comment_owner_links(request, post_id, comment_id, author_id):
+    if request.user.id != author_id:
+        return ''
+    return render_to_string(
+        'includes/comment_owner_links.html',
+        {'post_id': post_id, 'comment_id': comment_id},
+    )
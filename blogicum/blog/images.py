@@ -0,0 +1,232 @@
+'''Уменьшенные копии изображений постов и пересжатие загрузок.
+
+Копии лежат в отдельном каталоге RENDITIONS_DIR под именами, которые
+выводятся из имени оригинала, поэтому их адреса вычисляются без
+обращения к хранилищу. Загрузки в этот каталог не попадают, и нарезка
+копий не может перезаписать чужой оригинал.
+'''
+import logging
+import math
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Наибольшие ширина и высота каждой копии; пропорции сохраняются.
+RENDITIONS = {
+    'card': (640, 640),
+    'detail': (1280, 1280),
+    'admin-thumb': (100, 100),
+}
+
+# Значения EXIF Orientation, при которых снимок повёрнут на 90°.
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+EXIF_ORIENTATION = 0x0112
+
+# Каталог копий в хранилище; upload_to фото постов с ним не совпадает.
+RENDITIONS_DIR = 'renditions'
+
+# Копии, из которых браузер выбирает по ширине окна и плотности экрана.
+SRCSET_RENDITIONS = ('card', 'detail')
+
+
+def rendition_name(name, rendition, webp=False):
+    '''post_images/cat.png -> renditions/post_images/cat/card.png.
+
+    PNG остаётся PNG ради прозрачности, остальные форматы сохраняются
+    в JPEG. Рядом лежит та же копия в WebP:
+    renditions/post_images/cat/card.webp.
+    '''
+    path = PurePosixPath(name)
+    if webp:
+        suffix = '.webp'
+    else:
+        suffix = '.png' if path.suffix.lower() == '.png' else '.jpg'
+    return str(
+        PurePosixPath(RENDITIONS_DIR, path.with_suffix(''))
+        / f'{rendition}{suffix}'
+    )
+
+
+def rendition_url(post, rendition, webp=False):
+    '''Адрес копии, а пока копий нет — адрес оригинала.'''
+    if not post.has_renditions:
+        return post.image.url
+    return post.image.storage.url(
+        rendition_name(post.image.name, rendition, webp)
+    )
+
+
+def image_size(file):
+    '''Ширина и высота фото с учётом поворота из EXIF.
+
+    Читается только заголовок файла, пиксели не декодируются.
+    '''
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        orientation = image.getexif().get(EXIF_ORIENTATION)
+    if orientation in ROTATED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+def rendition_size(width, height, rendition):
+    '''Размер копии без открытия файла, как его считает Image.thumbnail.'''
+    max_width, max_height = RENDITIONS[rendition]
+    if max_width >= width and max_height >= height:
+        return width, height
+    aspect = width / height
+    if max_width / max_height >= aspect:
+        return _round_aspect(
+            max_height * aspect,
+            key=lambda n: abs(aspect - n / max_height),
+        ), max_height
+    return max_width, _round_aspect(
+        max_width / aspect,
+        key=lambda n: 0 if n == 0 else abs(aspect - max_width / n),
+    )
+
+
+def _round_aspect(number, key):
+    return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+
+def post_image_size(post, rendition):
+    '''Размер фото поста в копии rendition или None, если он не известен.'''
+    if not post.image_width or not post.image_height:
+        return None
+    if not post.has_renditions:
+        return post.image_width, post.image_height
+    return rendition_size(post.image_width, post.image_height, rendition)
+
+
+def rendition_srcset(post, webp=False):
+    '''Копии для просмотра в ленте и на странице поста, от меньшей.
+
+    Ширина копий вычисляется по сохранённому размеру оригинала; копии
+    одинаковой ширины, например у маленьких фото, указываются один раз.
+    '''
+    candidates = {}
+    for rendition in SRCSET_RENDITIONS:
+        size = post_image_size(post, rendition)
+        width = size[0] if size else RENDITIONS[rendition][0]
+        candidates.setdefault(width, rendition_url(post, rendition, webp))
+    return ', '.join(
+        f'{url} {width}w' for width, url in candidates.items()
+    )
+
+
+def _encode(image, name):
+    buffer = BytesIO()
+    quality = settings.BLOG_RENDITION_QUALITY
+    if name.endswith('.webp'):
+        image.save(buffer, 'WEBP', quality=quality, method=6)
+    elif name.endswith('.png'):
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(
+            buffer, 'JPEG',
+            quality=quality,
+            optimize=True,
+            progressive=True,
+        )
+    return buffer.getvalue()
+
+
+def make_renditions(name, storage=default_storage):
+    '''Нарезает все копии изображения name из хранилища.
+
+    Возвращает суммарный размер копий в байтах.
+    '''
+    with storage.open(name) as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        # Палитра GIF и PNG не годится для WebP и сглаживания.
+        original = original.convert(
+            'RGBA' if 'transparency' in original.info else 'RGB'
+        )
+    total = 0
+    for rendition, size in RENDITIONS.items():
+        image = original.copy()
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        for webp in (False, True):
+            target = rendition_name(name, rendition, webp)
+            content = _encode(image, target)
+            # В каталоге копий лежат только копии, их можно заменять.
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(content))
+            total += len(content)
+    return total
+
+
+def compress_upload(upload):
+    '''Уменьшает загруженное фото до BLOG_MAX_IMAGE_SIZE и пересжимает.
+
+    Поворот из EXIF применяется к пикселям, а сами EXIF, в том числе
+    координаты съёмки, не сохраняются; цветовой профиль остаётся.
+    Фото с прозрачностью сохраняются в PNG, остальные в JPEG с качеством
+    BLOG_UPLOAD_QUALITY. Анимация не пересжимается. Если результат не
+    меньше исходного файла, а менять размер и метаданные не нужно,
+    возвращается исходный файл.
+    '''
+    upload.seek(0)
+    image = Image.open(upload)
+    if getattr(image, 'is_animated', False):
+        return upload
+    original_size = image.size
+    max_size = settings.BLOG_MAX_IMAGE_SIZE
+    # JPEG декодируется сразу в уменьшенном в 2–8 раз виде: большие
+    # снимки с телефона не разворачиваются в память целиком.
+    image.draft('RGB', max_size)
+    exif = image.getexif()
+    icc_profile = image.info.get('icc_profile')
+    transparent = (
+        image.mode in ('RGBA', 'LA', 'PA')
+        or 'transparency' in image.info
+    )
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    stem = PurePosixPath(upload.name).stem
+    if transparent:
+        name, content_type = f'{stem}.png', 'image/png'
+        image.convert('RGBA').save(
+            buffer, 'PNG', optimize=True, icc_profile=icc_profile
+        )
+    else:
+        name, content_type = f'{stem}.jpg', 'image/jpeg'
+        image.convert('RGB').save(
+            buffer, 'JPEG',
+            quality=settings.BLOG_UPLOAD_QUALITY,
+            optimize=True,
+            progressive=True,
+            icc_profile=icc_profile,
+        )
+    saved = upload.size - buffer.tell()
+    if saved <= 0 and not exif and image.size == original_size:
+        logger.info('Фото %s сохранено без пересжатия', upload.name)
+        return upload
+    logger.info(
+        'Фото %s: %d → %d байт, сэкономлено %d',
+        upload.name, upload.size, buffer.tell(), saved,
+    )
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type)
+
+
+def render_for_pool(name):
+    '''Задача для пула процессов: (имя, байты копий или None при ошибке).'''
+    try:
+        return name, make_renditions(name)
+    except (OSError, Image.DecompressionBombError):
+        return name, None
@@ -0,0 +1,137 @@
+'''Очередь фоновых задач в таблице blog_job.
+
+Задачи регистрируются декоратором @task(name) и ставятся в очередь
+вызовом enqueue(name, **payload); аргументы должны сериализоваться
+в JSON. Выполняет их команда run_worker. Упавшая задача повторяется
+с растущей паузой, пока не кончатся попытки.
+
+При BLOG_JOBS_EAGER задача выполняется сразу в enqueue, без очереди.
+'''
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+
+from blog.models import Job
+
+tasks = {}
+
+
+def task(name, max_attempts=None):
+    '''Регистрирует функцию как задачу name.'''
+    def register(func):
+        tasks[name] = (func, max_attempts or settings.BLOG_JOB_MAX_ATTEMPTS)
+        return func
+    return register
+
+
+def enqueue(name, **payload):
+    '''Ставит задачу в очередь и возвращает её запись.
+
+    ATOMIC_REQUESTS не включён, поэтому запись сохраняется сразу. Только
+    внутри transaction.atomic она появится вместе с остальными
+    изменениями транзакции и исчезнет при её откате.
+    '''
+    func, max_attempts = tasks[name]
+    if settings.BLOG_JOBS_EAGER:
+        func(**payload)
+        return None
+    return Job.objects.create(
+        name=name, payload=payload, max_attempts=max_attempts
+    )
+
+
+def claim_job():
+    '''Забирает из очереди ближайшую задачу или возвращает None.
+
+    Задачу получает только один обработчик: её состояние меняется
+    условным UPDATE.
+    '''
+    while True:
+        now = timezone.now()
+        pk = Job.objects.filter(
+            status=Job.QUEUED, run_after__lte=now
+        ).order_by('run_after', 'id').values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+
+
+def run_job(job):
+    '''Выполняет забранную задачу и записывает результат и время.'''
+    started = time.perf_counter()
+    try:
+        if job.name not in tasks:
+            raise LookupError(f'Неизвестная задача {job.name}')
+        func, _ = tasks[job.name]
+        func(**job.payload)
+    except Exception as error:
+        job.last_error = f'{type(error).__name__}: {error}'
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.BLOG_JOB_RETRY_DELAY
+                * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status = Job.DONE
+        job.last_error = ''
+    job.duration = time.perf_counter() - started
+    job.finished_at = timezone.now()
+    job.save(update_fields=(
+        'status', 'run_after', 'duration', 'finished_at', 'last_error'
+    ))
+    return job
+
+
+def requeue_stuck_jobs():
+    '''Возвращает в очередь задачи упавших обработчиков.
+
+    Задача считается брошенной, если выполняется дольше
+    BLOG_JOB_TIMEOUT. Возвращает количество таких задач.
+    '''
+    stuck = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=timezone.now() - timedelta(
+            seconds=settings.BLOG_JOB_TIMEOUT
+        ),
+    )
+    failed = stuck.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error='Обработчик не завершил задачу.'
+    )
+    return failed + stuck.update(status=Job.QUEUED)
+
+
+def delete_finished_jobs():
+    '''Удаляет выполненные задачи старше BLOG_JOB_KEEP_DONE секунд.'''
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE,
+        finished_at__lt=timezone.now() - timedelta(
+            seconds=settings.BLOG_JOB_KEEP_DONE
+        ),
+    ).delete()
+    return deleted
+
+
+def job_stats():
+    '''Число задач по состояниям и время выполнения по именам задач.'''
+    done = Q(status=Job.DONE)
+    return Job.objects.values('name').annotate(
+        queued=Count('pk', filter=Q(status=Job.QUEUED)),
+        running=Count('pk', filter=Q(status=Job.RUNNING)),
+        done=Count('pk', filter=done),
+        failed=Count('pk', filter=Q(status=Job.FAILED)),
+        retried=Count('pk', filter=done & Q(attempts__gt=1)),
+        avg_duration=Avg('duration', filter=done),
+        max_duration=Max('duration', filter=done),
+    ).order_by('name')
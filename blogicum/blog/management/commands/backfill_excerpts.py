@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.backfill import backfill_posts
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы публикаций, сохранённых без них.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько публикаций обновлять за один запрос.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать анонсы всех публикаций, а не только пустые.',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.only('id', 'text')
+        if not options['all']:
+            queryset = queryset.filter(excerpt='')
+
+        def fill(post):
+            post.excerpt = make_excerpt(post.text)
+
+        updated = backfill_posts(
+            queryset, ('excerpt',), fill, options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Обновлено анонсов: {updated}'))
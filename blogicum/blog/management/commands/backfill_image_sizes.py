@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from blog.backfill import backfill_posts
+from blog.images import image_size
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Сохраняет размеры фото постов, загруженных до появления полей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько публикаций обновлять за один запрос.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перечитать размеры всех фото, а не только пустые.',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.exclude(image='').only('id', 'image')
+        if not options['all']:
+            queryset = queryset.filter(image_width__isnull=True)
+        failed = 0
+
+        def fill(post):
+            nonlocal failed
+            try:
+                with post.image.open() as file:
+                    size = image_size(file)
+            except (OSError, Image.DecompressionBombError) as error:
+                failed += 1
+                self.stderr.write(
+                    f'Пост {post.id}: не удалось прочитать'
+                    f' {post.image.name} ({error})'
+                )
+                return False
+            post.image_width, post.image_height = size
+
+        updated = backfill_posts(
+            queryset, ('image_width', 'image_height'), fill,
+            options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено размеров: {updated}, ошибок: {failed}'
+        ))
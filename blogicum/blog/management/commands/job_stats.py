@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.jobs import job_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает очередь фоновых задач и время их выполнения.'
+
+    def handle(self, *args, **options):
+        for row in job_stats():
+            timing = ''
+            if row['done']:
+                timing = (
+                    f', в среднем {row["avg_duration"]:.3f} с,'
+                    f' наибольшее {row["max_duration"]:.3f} с'
+                )
+            self.stdout.write(
+                f'{row["name"]}: в очереди {row["queued"]},'
+                f' выполняется {row["running"]},'
+                f' выполнено {row["done"]}'
+                f' (с повторами {row["retried"]}),'
+                f' не удалось {row["failed"]}{timing}'
+            )
@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import render_for_pool
+from blog.models import Post
+from blog.tasks import renditions_ready
+
+
+class Command(BaseCommand):
+    help = 'Нарезает уменьшенные копии фото уже опубликованных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help='Число процессов; по умолчанию по числу ядер.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько постов обрабатывать за один проход пула.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии всех фото, а не только недостающие.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.exclude(image='').only(
+            'id', 'image'
+        ).order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(has_renditions=False)
+        done = failed = total_bytes = 0
+        last_id = 0
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(options['processes']) as pool:
+            while True:
+                batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                names = {post.image.name for post in batch}
+                results = dict(pool.map(render_for_pool, names))
+                total_bytes += sum(
+                    size for size in results.values() if size is not None
+                )
+                ready = []
+                for post in batch:
+                    size = results[post.image.name]
+                    if size is None:
+                        failed += 1
+                        self.stderr.write(
+                            f'Не удалось обработать {post.image.name}'
+                        )
+                        continue
+                    ready.append(post.id)
+                renditions_ready(ready)
+                done += len(ready)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {done}, ошибок: {failed}, '
+            f'размер копий: {total_bytes} байт'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.page_cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает число попаданий и промахов кеша страниц.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]},'
+            f' доля попаданий: {ratio:.1%}'
+        )
+        if options['reset']:
+            reset_page_cache_stats()
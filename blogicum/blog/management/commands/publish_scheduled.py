@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduling import next_publication_at, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает в лентах отложенные посты, время публикации которых'
+        ' наступило. С флагом --loop работает как постоянный обработчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.',
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Наибольшая пауза между проверками, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f'Опубликовано постов: {published}')
+            if not options['loop']:
+                return
+            time.sleep(self.seconds_to_sleep(options['max_sleep']))
+
+    def seconds_to_sleep(self, max_sleep):
+        next_at = next_publication_at()
+        if next_at is None:
+            return max_sleep
+        seconds = (next_at - timezone.now()).total_seconds()
+        return min(max_sleep, max(seconds, 0))
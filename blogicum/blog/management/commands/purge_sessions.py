@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии небольшими порциями, не блокируя таблицу'
+        ' сессий надолго.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько сессий удалять за один запрос.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза между порциями в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE.endswith('signed_cookies'):
+            self.stdout.write('Сессии хранятся в cookie, удалять нечего.')
+            return
+        expired = Session.objects.filter(
+            expire_date__lt=timezone.now()
+        ).order_by('expire_date')
+        purged = 0
+        while True:
+            keys = list(expired.values_list(
+                'session_key', flat=True
+            )[:options['batch_size']])
+            if not keys:
+                break
+            purged += Session.objects.filter(session_key__in=keys).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших сессий: {purged}')
+        )
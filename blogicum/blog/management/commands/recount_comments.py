@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import recount_comment_counts
+from blog.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у всех публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Поставить пересчёт в очередь фоновых задач.',
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            enqueue('recount_comments')
+            self.stdout.write('Пересчёт поставлен в очередь.')
+            return
+        repaired = recount_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {repaired}')
+        )
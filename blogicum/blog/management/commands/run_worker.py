@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.jobs import (
+    claim_job, delete_finished_jobs, requeue_stuck_jobs, run_job
+)
+from blog.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди. Без флага --once работает'
+        ' как постоянный обработчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1,
+            help='Пауза при пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--max-jobs', type=int, default=None,
+            help='Завершиться после стольких задач.',
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while options['max_jobs'] is None or processed < options['max_jobs']:
+            job = claim_job()
+            if job is None:
+                requeue_stuck_jobs()
+                delete_finished_jobs()
+                if options['once']:
+                    break
+                close_old_connections()
+                time.sleep(options['sleep'])
+                continue
+            run_job(job)
+            processed += 1
+            self.report(job, options['verbosity'])
+        self.stdout.write(f'Выполнено задач: {processed}')
+
+    def report(self, job, verbosity):
+        if job.status == Job.DONE:
+            if verbosity > 1:
+                self.stdout.write(f'{job}: {job.duration:.3f} с')
+        elif job.status == Job.QUEUED:
+            self.stderr.write(
+                f'{job}: попытка {job.attempts} не удалась,'
+                f' повтор после {job.run_after:%H:%M:%S}: {job.last_error}'
+            )
+        else:
+            self.stderr.write(f'{job}: не удалась: {job.last_error}')
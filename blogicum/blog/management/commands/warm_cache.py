@@ -0,0 +1,152 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Category, Post
+from blog.page_cache import PAGE_CACHE
+from blog.views import IndexListView
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее отрисовывает популярные страницы, чтобы после перезапуска'
+        ' первые посетители не шли в базу. Работает только с общим для'
+        ' процессов кешем страниц: PAGE_CACHE_BACKEND=file или shared.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category-pages', type=int, default=3,
+            help='Сколько первых страниц каждой категории отрисовать.',
+        )
+        parser.add_argument(
+            '--posts', type=int, default=20,
+            help='Сколько последних и самых обсуждаемых постов отрисовать.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Сколько страниц отрисовывать одновременно.',
+        )
+        parser.add_argument(
+            '--username',
+            help=(
+                'Пользователь для страниц категорий: они доступны только'
+                ' после входа и кешируются при BLOG_DONUT_CACHE=1.'
+            ),
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Значение заголовка Host для запросов.',
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches[PAGE_CACHE], LocMemCache):
+            raise CommandError(
+                'Кеш страниц locmem у каждого процесса свой: страницы'
+                ' останутся в кеше этой команды. Задайте'
+                ' PAGE_CACHE_BACKEND=file или shared.'
+            )
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency должно быть не меньше 1.')
+        self.host = options['host']
+        login = Client(HTTP_HOST=self.host)
+        self.session_key = None
+        if options['username']:
+            user = get_user_model().objects.filter(
+                username=options['username']
+            ).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["username"]} не найден.'
+                )
+            login.force_login(user)
+            self.session_key = login.cookies[
+                settings.SESSION_COOKIE_NAME
+            ].value
+        try:
+            pages = self.get_pages(options)
+            started = time.monotonic()
+            with ThreadPoolExecutor(options['concurrency']) as executor:
+                results = list(executor.map(self.warm, pages))
+            elapsed = time.monotonic() - started
+        finally:
+            if self.session_key is not None:
+                login.logout()
+
+        for url, status, seconds in results:
+            if options['verbosity'] > 1 or status != 200:
+                self.stdout.write(f'{status}  {seconds * 1000:8.1f} мс  {url}')
+        failed = sum(status != 200 for _, status, _ in results)
+        self.stdout.write(
+            f'Страниц: {len(results)}, ошибок: {failed}, за {elapsed:.2f} с'
+            f' в {options["concurrency"]} потоках'
+        )
+        slowest = sorted(results, key=lambda result: -result[2])[:5]
+        for url, _, seconds in slowest:
+            self.stdout.write(f'  {seconds * 1000:8.1f} мс  {url}')
+
+    def get_pages(self, options):
+        '''Пары (адрес, нужен ли вход) в порядке отрисовки.'''
+        urls = [
+            reverse('blog:index'),
+            reverse('pages:about'),
+            reverse('pages:rules'),
+        ]
+        visible = Post.objects.filter(is_visible=True)
+        recent = visible.order_by('-pub_date', '-id').values_list(
+            'id', flat=True
+        )[:options['posts']]
+        discussed = visible.order_by('-comment_count', '-id').values_list(
+            'id', flat=True
+        )[:options['posts']]
+        urls.extend(
+            reverse('blog:post_detail', args=(post_id,))
+            for post_id in dict.fromkeys((*recent, *discussed))
+        )
+        pages = [(url, False) for url in urls]
+        pages.extend(
+            (url, True) for url in self.get_category_urls(options)
+        )
+        return pages
+
+    def get_category_urls(self, options):
+        if self.session_key is None or not settings.BLOG_DONUT_CACHE:
+            self.stdout.write(
+                'Страницы категорий пропущены: они кешируются только при'
+                ' BLOG_DONUT_CACHE=1 и требуют --username.'
+            )
+            return []
+        per_page = IndexListView.paginate_by
+        urls = []
+        for category in Category.objects.filter(is_published=True):
+            url = reverse('blog:category_posts', args=(category.slug,))
+            total = category.posts.filter(is_visible=True).count()
+            pages = min(
+                options['category_pages'], math.ceil(total / per_page)
+            )
+            urls.append(url)
+            urls.extend(f'{url}?page={page}' for page in range(2, pages + 1))
+        return urls
+
+    def warm(self, page):
+        '''Отрисовывает страницу и возвращает (адрес, код ответа, время).'''
+        url, logged_in = page
+        client = Client(HTTP_HOST=self.host)
+        if logged_in:
+            client.cookies[settings.SESSION_COOKIE_NAME] = self.session_key
+        try:
+            started = time.monotonic()
+            response = client.get(url)
+            return url, response.status_code, time.monotonic() - started
+        finally:
+            # У каждого потока своё соединение с базой.
+            connections.close_all()
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:57
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = list(Post.objects.only('id', 'text'))
+    for post in posts:
+        post.excerpt = Truncator(post.text).words(10, truncate=' …')
+    Post.objects.bulk_update(posts, ('excerpt',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста для карточки в ленте.', verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:58
+
+from django.db import migrations, models
+
+
+def fill_visibility(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).update(is_visible=True)
+    Post.objects.filter(location__is_published=True).update(
+        location_visible=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Пост и его категория опубликованы.', verbose_name='Виден в лентах'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='location_visible',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Показывать местоположение'),
+        ),
+        migrations.RunPython(fill_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['pub_date'], name='post_visible_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', 'pub_date'], name='post_category_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_scheduled_visibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Растёт при любом изменении, которое отражается в карточке поста.', verbose_name='Версия'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='has_renditions',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Есть уменьшенные копии фото'),
+        ),
+    ]
@@ -1,41 +1,225 @@
-from django.core.paginator import Paginator
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import redirect, reverse
-from django.utils import timezone
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.utils.http import http_date, quote_etag
 
 from blog.models import Comment, Post
 from blog.forms import CommentForm, PostForm
+from blog.page_cache import (
+    conditional_response, fill_page, get_cached_page, page_cache_key,
+    personalize_etag, release_page, store_page
+)
+from blog.paginators import CachedCountPaginator, KeysetPaginator
+from blog.scheduling import publish_if_due
+
+
+class PageCacheMixin:
+    '''Кеширует страницу целиком, общей для всех пользователей.
+
+    Ключ состоит из пути с параметрами и версий меток страницы; сигналы
+    моделей меняют версии только затронутых меток. Истёкшую страницу
+    отрисовывает один запрос, остальные в это время получают прежнюю.
+
+    Личные фрагменты (шапка, форма комментария, ссылки автора) в
+    кешируемой странице заменены метками и отрисовываются для каждого
+    запроса, см. blog.holes. Для вошедших пользователей это включается
+    настройкой BLOG_DONUT_CACHE.
+    '''
+
+    punch_holes = False
 
+    def get_page_cache_tags(self):
+        return ('feed',)
 
-class PaginatorMixin:
-    '''Постраничный вывод для страницы категории.'''
+    def is_page_shared(self):
+        '''Можно ли показать эту страницу любому пользователю.'''
+        return True
 
-    def my_pagination(self, context, per_page=10):
-        paginator = Paginator(context['post_list'], per_page)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        page_obj = paginator.get_page(1)
-        context['page_obj'] = page_obj
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['punch_holes'] = self.punch_holes
         return context
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or (
+            request.user.is_authenticated and not settings.BLOG_DONUT_CACHE
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.get_page_cache_tags())
+        cached = get_cached_page(request, key)
+        if cached is not None:
+            return conditional_response(request, cached)
+        self.punch_holes = True
+        started = time.monotonic()
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Exception:
+            release_page(key)
+            raise
+        if not hasattr(response, 'add_post_render_callback'):
+            release_page(key)
+            return response
+        if self.is_page_shared():
+            response.add_post_render_callback(
+                partial(store_page, key, started)
+            )
+        else:
+            release_page(key)
+        response.add_post_render_callback(partial(fill_page, request))
+        return response
+
+
+class ConditionalGetMixin:
+    '''Заголовки ETag и Last-Modified и ответ 304 без отрисовки шаблона.
+
+    Состояние страницы для условного запроса вычисляет get_page_state()
+    лёгким запросом к базе. В обычном ответе то же состояние берётся
+    get_rendered_state() из объектов, уже загруженных для шаблона, и
+    лишних запросов не добавляет. Оба метода возвращают пару
+    (данные для ETag, время последнего изменения или None) или None.
+    '''
+
+    def get_page_state(self):
+        raise NotImplementedError
 
-class IndexCategoryProfileMixin():
+    def get_rendered_state(self, context):
+        raise NotImplementedError
+
+    def set_validators(self, response, state, last_modified):
+        etag = quote_etag(hashlib.md5(repr(state).encode()).hexdigest())
+        # Общий для всех пользователей ETag сохраняется в кеше страниц.
+        response.shared_etag = etag
+        response['ETag'] = personalize_etag(self.request, etag)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+
+    def dispatch(self, request, *args, **kwargs):
+        is_conditional = (
+            'HTTP_IF_NONE_MATCH' in request.META
+            or 'HTTP_IF_MODIFIED_SINCE' in request.META
+        )
+        if request.method in ('GET', 'HEAD') and is_conditional:
+            page_state = self.get_page_state()
+            if page_state is not None:
+                validators = HttpResponse()
+                self.set_validators(validators, *page_state)
+                response = conditional_response(request, validators)
+                if response is not validators:
+                    return response
+        return super().dispatch(request, *args, **kwargs)
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        page_state = self.get_rendered_state(context)
+        if page_state is not None:
+            self.set_validators(response, *page_state)
+        return response
+
+
+class IndexCategoryProfileMixin(ConditionalGetMixin):
 
     model = Post
     paginate_by = 10
+    paginator_class = CachedCountPaginator
+    ordering = ('-pub_date', '-id')
+
+    def shows_unpublished(self):
+        '''Показывает ли страница неопубликованные посты.'''
+        return False
+
+    def get_count_cache_key(self):
+        return ':'.join((
+            type(self).__name__,
+            self.kwargs.get('category_slug', ''),
+            self.kwargs.get('username', ''),
+            'all' if self.shows_unpublished() else 'published',
+        ))
+
+    def get_paginator(self, *args, **kwargs):
+        kwargs.setdefault('cache_key', self.get_count_cache_key())
+        return super().get_paginator(*args, **kwargs)
+
+    def use_cursor_pagination(self):
+        '''Курсорный режим включается настройкой или параметром cursor.'''
+        return (
+            getattr(settings, 'BLOG_CURSOR_PAGINATION', False)
+            or 'cursor' in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.get_ordering())
+        page = paginator.get_page(self.request.GET.get('cursor'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_extra_state(self):
+        '''Данные страницы помимо постов, влияющие на ETag.'''
+        return None
+
+    def describe_page(self, page, rows):
+        '''Состояние страницы по строкам (pk, version).
+
+        Last-Modified у списков не выставляется: удаление поста и
+        отложенная публикация меняют страницу, не меняя updated_at
+        оставшихся на ней постов, и запрос только с If-Modified-Since
+        получил бы 304. Списки проверяются по ETag.
+        '''
+        total = (
+            None if getattr(page, 'cursor_based', False)
+            else page.paginator.count
+        )
+        state = (
+            list(rows),
+            total,
+            page.has_next(),
+            page.has_previous(),
+            self.get_extra_state(),
+        )
+        return state, None
+
+    def get_page_state(self):
+        queryset = self.get_queryset().values_list('pk', 'version')
+        _, page, rows, _ = self.paginate_queryset(
+            queryset, self.get_paginate_by(queryset)
+        )
+        return self.describe_page(page, [tuple(row) for row in rows])
+
+    def get_rendered_state(self, context):
+        page = context['page_obj']
+        return self.describe_page(page, [
+            (post.pk, post.version) for post in page
+        ])
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = queryset.filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
-        ).order_by('-pub_date').annotate(comment_count=Count('comments'))
-        return queryset
+        queryset = super().get_queryset().select_related(
+            'author', 'category', 'location'
+        ).defer('text')
+        if self.shows_unpublished():
+            return queryset
+        publish_if_due()
+        return queryset.filter(is_visible=True)
 
 
-class CommentUpdateDeleteMixin(LoginRequiredMixin):
+class SingleFetchMixin:
+    '''Загружает объект один раз за запрос.
+
+    dispatch() и методы UpdateView/DeleteView получают один и тот же
+    экземпляр вместо повторного запроса к базе.
+    '''
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
+
+
+class CommentUpdateDeleteMixin(SingleFetchMixin, LoginRequiredMixin):
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
@@ -43,7 +227,7 @@ class CommentUpdateDeleteMixin(LoginRequiredMixin):
 
     def dispatch(self, request, *args, **kwargs):
         instance = self.get_object()
-        if instance.author != request.user:
+        if instance.author_id != request.user.id:
             return redirect('blog:post_detail', instance.post_id)
         return super().dispatch(request, *args, **kwargs)
 
@@ -54,13 +238,31 @@ class CommentUpdateDeleteMixin(LoginRequiredMixin):
         )
 
 
-class PostUpdateDeleteMixin(LoginRequiredMixin):
+class RejectedUploadsMixin:
+    '''Передаёт форме поля, загрузку файлов которых прервал
+    blog.uploads.CappedTemporaryFileUploadHandler.'''
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['rejected_uploads'] = getattr(
+            self.request, 'rejected_uploads', ()
+        )
+        return kwargs
+
+
+class PostUpdateDeleteMixin(SingleFetchMixin, LoginRequiredMixin):
+    '''Правка и удаление поста.
+
+    Пост всегда читается из базы, а не из кеша постов: сохраняется
+    экземпляр целиком.
+    '''
+
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
 
     def dispatch(self, request, *args, **kwargs):
         instance = self.get_object()
-        if instance.author != request.user:
+        if instance.author_id != request.user.id:
             return redirect('blog:post_detail', self.kwargs['pk'])
         return super().dispatch(request, *args, **kwargs)
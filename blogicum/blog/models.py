@@ -1,11 +1,21 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from blog.images import image_size
 
 TRUNCATE_LENGTH = 30
+EXCERPT_WORDS = 10
 User = get_user_model()
 
 
+def make_excerpt(text):
+    '''То же, что фильтр truncatewords в карточке поста.'''
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
 class PublishedModel(models.Model):
     '''Абстрактная модель.'''
 
@@ -39,11 +49,32 @@ class Location(PublishedModel):
         return self.name[:TRUNCATE_LENGTH]
 
 
+class PostQuerySet(models.QuerySet):
+
+    def touch(self, **fields):
+        '''Обновляет поля и отмечает посты изменёнными.
+
+        Растут версия карточки и время изменения, по которым строятся
+        ключи кеша и заголовки ETag/Last-Modified.
+        '''
+        return self.update(
+            version=models.F('version') + 1,
+            updated_at=timezone.now(),
+            **fields,
+        )
+
+
 class Post(PublishedModel):
     '''Модель постов.'''
 
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField('Текст')
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для карточки в ленте.',
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -52,6 +83,20 @@ class Post(PublishedModel):
         )
     )
     image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    # Размер с учётом поворота из EXIF; заполняется при загрузке, чтобы
+    # при выводе страниц не открывать файлы. ImageField.width_field
+    # не подходит: он открывает файл при каждой загрузке поста без размера.
+    image_width = models.PositiveIntegerField(
+        'Ширина фото', null=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота фото', null=True, editable=False
+    )
+    has_renditions = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Есть уменьшенные копии фото',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -69,11 +114,59 @@ class Post(PublishedModel):
         on_delete=models.SET_NULL,
         null=True, verbose_name='Категория',
     )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в лентах',
+        help_text=(
+            'Пост и его категория опубликованы, время публикации наступило.'
+        ),
+    )
+    location_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Показывать местоположение',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия',
+        help_text=(
+            'Растёт при любом изменении, которое отражается в карточке поста.'
+        ),
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title[:TRUNCATE_LENGTH]
@@ -81,6 +174,75 @@ class Post(PublishedModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.pk})
 
+    # Поля, которые меняют запросы UPDATE в сигналах и фоновых задачах.
+    # Экземпляр мог быть загружен до такого запроса, поэтому при правке
+    # поста они не записываются из экземпляра, а версия растёт в самом
+    # UPDATE. После сохранения они перечитываются при первом обращении.
+    QUERY_MAINTAINED_FIELDS = ('comment_count', 'version', 'has_renditions')
+
+    def save(self, *args, **kwargs):
+        updating = not self._state.adding and self.pk is not None
+        maintained = set(self.QUERY_MAINTAINED_FIELDS)
+        self.excerpt = make_excerpt(self.text)
+        self.is_visible = (
+            self.is_published
+            and self.pub_date is not None
+            and self.pub_date <= timezone.now()
+            and self._is_related_published('category')
+        )
+        self.location_visible = self._is_related_published('location')
+        if not self.image:
+            self.has_renditions = False
+            self.image_width = self.image_height = None
+            maintained.discard('has_renditions')
+        elif not self.image._committed:
+            # Копии нарезает фоновая задача после сохранения поста,
+            # см. blog.signals.enqueue_renditions.
+            self.image_width, self.image_height = image_size(self.image)
+            self.has_renditions = False
+            self._image_uploaded = True
+            maintained.discard('has_renditions')
+        if not updating:
+            # Удалённый пост сохраняется заново со счётчиками по умолчанию.
+            for name in self.get_deferred_fields() & maintained:
+                setattr(self, name, self._meta.get_field(name).get_default())
+            self.version += 1
+            return super().save(*args, **kwargs)
+        self.version = models.F('version') + 1
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in maintained - {'version'}
+            ]
+        try:
+            return super().save(*args, **kwargs)
+        finally:
+            for name in self.QUERY_MAINTAINED_FIELDS:
+                if name in maintained:
+                    self.__dict__.pop(name, None)
+
+    def clean_fields(self, exclude=None):
+        '''Не проверяет запросом связанные объекты, уже загруженные формой.'''
+        exclude = set(exclude or ())
+        exclude.update(
+            field.name for field in self._meta.concrete_fields
+            if field.many_to_one and field.is_cached(self)
+            and getattr(self, field.name) is not None
+        )
+        super().clean_fields(exclude)
+
+    def _is_related_published(self, name):
+        field = self._meta.get_field(name)
+        related_id = getattr(self, field.attname)
+        if related_id is None:
+            return False
+        if field.is_cached(self):
+            return getattr(self, name).is_published
+        return field.related_model.objects.filter(
+            pk=related_id, is_published=True
+        ).exists()
+
 
 class Category(PublishedModel):
     '''Модель категории.'''
@@ -117,13 +279,94 @@ class Comment(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Добавлено')
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
 
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return f'''Комментарий {self.author} к посту "{self.post}"
                    (ID: {self.id}).'''
+
+
+class Job(models.Model):
+    '''Фоновая задача, см. blog.jobs.'''
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не удалась'),
+    )
+
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, verbose_name='Аргументы')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name='Состояние',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name='Наибольшее число попыток',
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить не раньше',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Начата',
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена',
+    )
+    duration = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Длительность, с',
+        help_text='Время последней попытки.',
+    )
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(
+                fields=('run_after', 'id'),
+                condition=models.Q(status='queued'),
+                name='job_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
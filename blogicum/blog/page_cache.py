@@ -0,0 +1,162 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from blog.caching import (
+    PAGE_CACHE, acquire_lock, bump_versions, increment, read_entry,
+    release_lock, store_entry, versioned_key, wait_for_entry
+)
+from blog.holes import fill_holes
+from blog.models import Post
+from blog.scheduling import timeout_until_next_publication
+
+HITS_KEY = 'blog:page-cache:hits'
+MISSES_KEY = 'blog:page-cache:misses'
+
+
+def page_cache_key(request, tags):
+    return versioned_key(
+        'blog:page', tags, request.get_full_path(), using=PAGE_CACHE
+    )
+
+
+def get_cached_page(request, key):
+    '''Сохранённая страница или None, если её должен отрисовать этот запрос.
+
+    Устаревшую страницу отрисовывает запрос, захвативший блокировку;
+    остальные тем временем получают прежнюю версию, а если её нет,
+    ждут результат. В страницу вставляются фрагменты пользователя.
+    '''
+    page, fresh = read_entry(key, PAGE_CACHE)
+    status = 'HIT'
+    if not fresh:
+        if acquire_lock(key, PAGE_CACHE):
+            increment(MISSES_KEY, PAGE_CACHE)
+            return None
+        if page is not None:
+            status = 'STALE'
+        else:
+            page = wait_for_entry(key, PAGE_CACHE)
+            if page is None:
+                increment(MISSES_KEY, PAGE_CACHE)
+                return None
+    increment(HITS_KEY, PAGE_CACHE)
+    content, content_type, validators = page
+    response = HttpResponse(content, content_type=content_type)
+    fill_page(request, response)
+    for header, value in validators.items():
+        response[header] = value
+    if response.has_header('ETag'):
+        response['ETag'] = personalize_etag(request, response['ETag'])
+    response['X-Page-Cache'] = status
+    return response
+
+
+def store_page(key, started, response):
+    '''Сохраняет отрисованную страницу, если в ней нет личных данных.
+
+    started — время начала отрисовки по time.monotonic().
+    '''
+    response['X-Page-Cache'] = 'MISS'
+    try:
+        if response.status_code != 200 or response.cookies:
+            return
+        validators = {}
+        if hasattr(response, 'shared_etag'):
+            validators['ETag'] = response.shared_etag
+        if response.has_header('Last-Modified'):
+            validators['Last-Modified'] = response['Last-Modified']
+        store_entry(
+            key,
+            (response.content, response['Content-Type'], validators),
+            timeout_until_next_publication(settings.BLOG_PAGE_CACHE_TIMEOUT),
+            time.monotonic() - started,
+            PAGE_CACHE,
+        )
+    finally:
+        release_lock(key, PAGE_CACHE)
+
+
+def fill_page(request, response):
+    '''Заменяет метки личных фрагментов фрагментами для request.user.'''
+    response.content = fill_holes(
+        request, response.content.decode(response.charset)
+    )
+
+
+def personalize_etag(request, etag):
+    '''ETag общей страницы для пользователя из request.
+
+    Фрагменты вошедшего пользователя содержат его имя и CSRF-токен.
+    '''
+    if not request.user.is_authenticated:
+        return etag
+    raw = '|'.join((
+        etag,
+        str(request.user.pk),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def release_page(key):
+    '''Снимает блокировку, если ответ не будет сохранён.'''
+    release_lock(key, PAGE_CACHE)
+
+
+def conditional_response(request, response):
+    '''304 Not Modified, если ETag или Last-Modified ответа не изменились.
+
+    Иначе возвращает сам ответ.
+    '''
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+        response=response,
+    )
+
+
+def page_cache_stats():
+    counters = caches[PAGE_CACHE].get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': counters.get(HITS_KEY, 0),
+        'misses': counters.get(MISSES_KEY, 0),
+    }
+
+
+def reset_page_cache_stats():
+    caches[PAGE_CACHE].delete_many((HITS_KEY, MISSES_KEY))
+
+
+def invalidate_pages(tags):
+    bump_versions(tags, PAGE_CACHE)
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def post_tags(post_ids):
+    '''Метки страниц, на которых выводятся эти посты.'''
+    slugs = Post.objects.filter(
+        pk__in=post_ids, category__isnull=False
+    ).values_list('category__slug', flat=True).distinct()
+    return {
+        'feed',
+        *(f'post:{post_id}' for post_id in post_ids),
+        *(category_tag(slug) for slug in slugs),
+    }
+
+
+def post_page_tags(post_id, category_slug=None):
+    '''Метки страниц одного поста, категория которого уже известна.'''
+    tags = {'feed', f'post:{post_id}'}
+    if category_slug:
+        tags.add(category_tag(category_slug))
+    return tags
@@ -0,0 +1,229 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.caching import PAGE_CACHE, get_or_compute, get_version
+from blog.scheduling import timeout_until_next_publication
+
+OLDER = 'older'
+NEWER = 'newer'
+
+
+class CachedCountPaginator(Paginator):
+    '''Пагинатор, который берёт общее число объектов из кеша.
+
+    Точное значение хранится под ключом с версией публикаций и сбрасывается
+    при любом изменении постов или категорий; истёкшее значение
+    пересчитывает один запрос. Если число превышает
+    BLOG_APPROXIMATE_COUNT_THRESHOLD, оно считается приблизительным:
+    хранится без версии и пересчитывается только по истечении
+    BLOG_APPROXIMATE_COUNT_TIMEOUT.
+    '''
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        cache = caches[PAGE_CACHE]
+        version = get_version('posts', PAGE_CACHE)
+        exact_key = f'blog:post-count:{version}:{self.cache_key}'
+        approximate_key = f'blog:post-count:approx:{self.cache_key}'
+        approximate = cache.get(approximate_key)
+        if approximate is not None:
+            return approximate
+        count = get_or_compute(
+            exact_key,
+            self._count_objects,
+            timeout_until_next_publication(settings.BLOG_POST_COUNT_TIMEOUT),
+            PAGE_CACHE,
+        )
+        threshold = settings.BLOG_APPROXIMATE_COUNT_THRESHOLD
+        if threshold is not None and count >= threshold:
+            cache.set(
+                approximate_key, count,
+                settings.BLOG_APPROXIMATE_COUNT_TIMEOUT
+            )
+        return count
+
+    def _count_objects(self):
+        return super().count
+
+
+class KeysetPage:
+    '''Страница курсорной пагинации.'''
+
+    cursor_based = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(OLDER, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(NEWER, self.object_list[0])
+
+
+class KeysetPaginator:
+    '''Курсорная пагинация по упорядоченному набору полей.
+
+    Страница выбирается условием на значения ключа последней показанной
+    записи, поэтому запрос не использует ни COUNT, ни OFFSET.
+    '''
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def encode_cursor(self, direction, obj):
+        return self._encode(
+            direction, [getattr(obj, name) for name, _ in self.fields]
+        )
+
+    def _encode(self, direction, values):
+        payload = json.dumps([direction, [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        '''Возвращает (направление, значения ключа) или None.'''
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (OLDER, NEWER):
+                return None
+            if len(raw_values) != len(self.fields):
+                return None
+            opts = self.object_list.model._meta
+            values = [
+                self._to_python(opts.get_field(name), value)
+                for (name, _), value in zip(self.fields, raw_values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
+        return direction, values
+
+    def _to_python(self, field, value):
+        '''Значение ключа, которое можно подставить в запрос.
+
+        None и целые вне диапазона столбца запрос не принимает. Диапазон
+        берётся из integer_field_ranges: integer_field_range() у SQLite
+        границ не сообщает, хотя драйвер шире 64 бит не принимает.
+        '''
+        value = field.to_python(value)
+        if value is None:
+            raise ValueError('Пустое значение ключа')
+        ops = connections[self.object_list.db].ops
+        internal_type = field.get_internal_type()
+        if internal_type in ops.integer_field_ranges:
+            low, high = ops.integer_field_ranges[internal_type]
+            if not low <= value <= high:
+                raise ValueError('Значение ключа вне диапазона')
+        return value
+
+    def _seek(self, values, backwards):
+        '''Условие «строго после ключа» в порядке сортировки.'''
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def _order(self, backwards):
+        if not backwards:
+            return self.ordering
+        return tuple(
+            name if descending else f'-{name}'
+            for name, descending in self.fields
+        )
+
+    def cursor_ending_at(self, obj):
+        '''Курсор страницы, последняя запись которой — obj.
+
+        None, если obj попадает на первую страницу. Предшествующие
+        записи выбираются в обратном порядке без OFFSET.
+        '''
+        values = [getattr(obj, name) for name, _ in self.fields]
+        previous = list(
+            self.object_list.order_by(*self._order(True))
+            .filter(self._seek(values, True))
+            .values_list(*(name for name, _ in self.fields))
+            [:self.per_page]
+        )
+        if len(previous) < self.per_page:
+            return None
+        return self._encode(OLDER, previous[-1])
+
+    def page_queryset(self, values=None, backwards=False):
+        '''Запрос страницы: per_page + 1 записей после ключа values.'''
+        queryset = self.object_list.order_by(*self._order(backwards))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        return queryset[:self.per_page + 1]
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor)
+        direction, values = decoded if decoded else (OLDER, None)
+        backwards = direction == NEWER
+        rows = list(self.page_queryset(values, backwards))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            if not has_more:
+                return self.get_page()
+            rows.reverse()
+            return KeysetPage(rows, self, True, True)
+        return KeysetPage(
+            rows, self, has_more, values is not None and bool(rows)
+        )
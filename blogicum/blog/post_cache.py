@@ -0,0 +1,81 @@
+'''Кеш постов по первичному ключу вместе с автором, категорией и
+местоположением.
+
+Запись хранит версии меток поста и связанных объектов и считается
+устаревшей, если любая из них изменилась. Версии меняют сигналы моделей,
+в том числе при правках из админки. Отсутствующие посты тоже кешируются,
+чтобы перебор несуществующих адресов не доходил до базы.
+
+Посты и версии хранятся в кеше страниц, чтобы страница из общего кеша
+не собиралась из поста, устаревшего в кеше одного процесса. Если и кеш
+страниц у процессов свой, чужие изменения видны только по истечении
+BLOG_POST_OBJECT_TIMEOUT.
+Для правки пост берётся из базы, см. blog.mixins.PostUpdateDeleteMixin.
+'''
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+
+from blog.caching import PAGE_CACHE, bump_versions, get_versions
+from blog.models import Post
+
+POST_KEY = 'blog:post-object:{}'
+MISSING = 'missing'
+
+
+def post_object_tag(post_id):
+    return f'post-object:{post_id}'
+
+
+def related_object_tag(name, pk):
+    '''Метка автора, категории или местоположения постов.'''
+    return f'post-{name}:{pk}'
+
+
+def _object_tags(post_id, post):
+    tags = [post_object_tag(post_id)]
+    if post is not None:
+        tags.extend((
+            related_object_tag('author', post.author_id),
+            related_object_tag('category', post.category_id),
+            related_object_tag('location', post.location_id),
+        ))
+    return tags
+
+
+def get_post(post_id):
+    '''Пост со связанными объектами или None, если его нет.'''
+    cache = caches[PAGE_CACHE]
+    key = POST_KEY.format(post_id)
+    cached = cache.get(key)
+    if cached is not None:
+        post, versions = cached
+        if get_versions(versions, PAGE_CACHE) == versions:
+            return None if post == MISSING else post
+    post = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).filter(pk=post_id).first()
+    versions = get_versions(_object_tags(post_id, post), PAGE_CACHE)
+    if post is None:
+        cache.set(key, (MISSING, versions), settings.BLOG_MISSING_POST_TIMEOUT)
+    else:
+        cache.set(key, (post, versions), settings.BLOG_POST_OBJECT_TIMEOUT)
+    return post
+
+
+def get_post_or_404(post_id):
+    post = get_post(post_id)
+    if post is None:
+        raise Http404('Page was not found')
+    return post
+
+
+def forget_posts(post_ids):
+    bump_versions(
+        (post_object_tag(post_id) for post_id in post_ids), PAGE_CACHE
+    )
+
+
+def forget_related_posts(name, pk):
+    '''Сбрасывает посты автора, категории или местоположения.'''
+    bump_versions((related_object_tag(name, pk),), PAGE_CACHE)
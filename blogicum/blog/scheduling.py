@@ -0,0 +1,82 @@
+import math
+
+from django.core.cache import caches
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.caching import PAGE_CACHE, bump_version
+from blog.models import Post
+
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+NOTHING_SCHEDULED = 'nothing'
+
+# Отправляется с post_ids, когда отложенные посты появляются в лентах.
+posts_published = Signal()
+
+
+def pending_posts():
+    '''Опубликованные посты, которые ещё не появились в лентах.'''
+    return Post.objects.filter(
+        is_published=True,
+        is_visible=False,
+        category__is_published=True,
+    )
+
+
+def refresh_next_publication():
+    '''Пересчитывает время ближайшей отложенной публикации.
+
+    Время хранится в кеше страниц: по нему истекают сохранённые ленты,
+    и после правки поста его должны увидеть все процессы сервера.
+    '''
+    next_at = pending_posts().aggregate(next_at=Min('pub_date'))['next_at']
+    caches[PAGE_CACHE].set(
+        NEXT_PUBLICATION_KEY, next_at or NOTHING_SCHEDULED, None
+    )
+    return next_at
+
+
+def next_publication_at():
+    '''Время ближайшей отложенной публикации или None.'''
+    next_at = caches[PAGE_CACHE].get(NEXT_PUBLICATION_KEY)
+    if next_at is None:
+        return refresh_next_publication()
+    if next_at == NOTHING_SCHEDULED:
+        return None
+    return next_at
+
+
+def publish_due_posts():
+    '''Показывает в лентах посты, время публикации которых наступило.
+
+    Возвращает количество опубликованных постов.
+    '''
+    due = pending_posts().filter(pub_date__lte=timezone.now())
+    post_ids = list(due.values_list('id', flat=True))
+    published = Post.objects.filter(pk__in=post_ids).update(is_visible=True)
+    if published:
+        bump_version('posts', PAGE_CACHE)
+        posts_published.send(sender=Post, post_ids=post_ids)
+    refresh_next_publication()
+    return published
+
+
+def publish_if_due():
+    '''Дешёвая проверка для каждого запроса к ленте.
+
+    Обращается к базе, только если отложенный пост уже должен выйти,
+    поэтому ленты остаются корректными и без запущенного планировщика.
+    '''
+    next_at = next_publication_at()
+    if next_at is not None and next_at <= timezone.now():
+        publish_due_posts()
+
+
+def timeout_until_next_publication(timeout):
+    '''Срок жизни кеша ленты, истекающий к ближайшей публикации.'''
+    next_at = next_publication_at()
+    if next_at is None:
+        return timeout
+    seconds = math.ceil((next_at - timezone.now()).total_seconds())
+    return max(1, min(timeout, seconds))
@@ -0,0 +1,340 @@
+import threading
+
+from django.db.models import F, Q
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.caching import PAGE_CACHE, bump_version
+from blog.counters import recount_post_comments
+from blog.jobs import enqueue
+from blog.models import Category, Comment, Location, Post, User
+from blog.page_cache import (
+    category_tag, invalidate_pages, post_page_tags, post_tags
+)
+from blog.post_cache import forget_posts, forget_related_posts
+from blog.scheduling import posts_published, refresh_next_publication
+
+
+class _Deleting(threading.local):
+    '''Посты и авторы, комментарии которых удаляются каскадом.'''
+
+    def __init__(self):
+        self.posts = set()
+        self.authors = set()
+
+
+_deleting = _Deleting()
+
+
+def _deleted_in_cascade(comment):
+    '''Комментарий удаляется вместе с постом или автором.
+
+    Тогда счётчики и кеши обновляют обработчики удаления поста или
+    пользователя, один раз на пост, а не на каждый комментарий.
+    '''
+    return (
+        comment.post_id in _deleting.posts
+        or comment.author_id in _deleting.authors
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def start_post_delete(sender, instance, **kwargs):
+    _deleting.posts.add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def finish_post_delete(sender, instance, **kwargs):
+    _deleting.posts.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def start_user_delete(sender, instance, **kwargs):
+    '''Запоминает чужие посты, которые комментировал пользователь.'''
+    _deleting.authors.add(instance.pk)
+    instance._commented_post_ids = list(
+        Comment.objects.filter(author=instance)
+        .exclude(post__author=instance)
+        .values_list('post_id', flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_delete, sender=User)
+def finish_user_delete(sender, instance, **kwargs):
+    _deleting.authors.discard(instance.pk)
+    recount_post_comments(getattr(instance, '_commented_post_ids', ()))
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    '''Учитывает новый комментарий в счётчике поста.
+
+    Правка комментария тоже меняет страницу поста.
+    '''
+    posts = Post.objects.filter(pk=instance.post_id)
+    if created:
+        posts.touch(comment_count=F('comment_count') + 1)
+    else:
+        posts.touch()
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    '''Срабатывает и при удалении из админки, в том числе массовом.'''
+    if _deleted_in_cascade(instance):
+        return
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).touch(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Category)
+def propagate_category_visibility(sender, instance, **kwargs):
+    '''Обновляет видимость и версии карточек постов категории.'''
+    posts = Post.objects.filter(category=instance)
+    posts.touch()
+    if instance.is_published:
+        posts.filter(
+            is_published=True,
+            is_visible=False,
+            pub_date__lte=timezone.now(),
+        ).update(is_visible=True)
+    else:
+        posts.filter(is_visible=True).update(is_visible=False)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    '''Посты удаляемой категории остаются без категории и скрываются.'''
+    Post.objects.filter(category=instance).touch(is_visible=False)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    instance._old_username = None
+    if instance.pk and (update_fields is None or 'username' in update_fields):
+        instance._old_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def bump_author_post_versions(sender, instance, **kwargs):
+    '''Посты и комментарии показывают имя автора.
+
+    Сбрасываются страницы его постов и постов, которые он комментировал.
+    Вход пользователя и правка профиля имя не меняют и ничего не
+    сбрасывают.
+    '''
+    old_username = getattr(instance, '_old_username', None)
+    if old_username is None or old_username == instance.username:
+        return
+    posts = Post.objects.filter(
+        Q(author=instance)
+        | Q(pk__in=Comment.objects.filter(author=instance).values('post'))
+    )
+    post_ids = list(posts.values_list('pk', flat=True))
+    posts.touch()
+    forget_posts(post_ids)
+    invalidate_pages(post_tags(post_ids))
+
+
+@receiver(post_save, sender=Location)
+def propagate_location_visibility(sender, instance, **kwargs):
+    Post.objects.filter(location=instance).touch(
+        location_visible=instance.is_published,
+    )
+
+
+@receiver(pre_delete, sender=Location)
+def hide_location(sender, instance, **kwargs):
+    Post.objects.filter(location=instance).touch(location_visible=False)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_caches(sender, **kwargs):
+    '''Сбрасывает число постов в лентах и время ближайшей публикации.'''
+    bump_version('posts', PAGE_CACHE)
+    refresh_next_publication()
+
+
+def _may_wait_for_publication(is_published, is_visible):
+    '''Пост может быть отложенным; категорию проверяет pending_posts().'''
+    return is_published and not is_visible
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_pages(sender, instance, **kwargs):
+    '''Запоминает страницы поста до изменения, например старую категорию.
+
+    Тем же запросом выясняется, мог ли пост ждать публикации.
+    '''
+    saved = None
+    if instance.pk:
+        saved = Post.objects.filter(pk=instance.pk).values(
+            'category__slug', 'is_published', 'is_visible'
+        ).first()
+    instance._page_cache_tags = set()
+    instance._was_waiting = False
+    if saved:
+        instance._page_cache_tags = post_page_tags(
+            instance.pk, saved['category__slug']
+        )
+        instance._was_waiting = _may_wait_for_publication(
+            saved['is_published'], saved['is_visible']
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_count(sender, instance, **kwargs):
+    '''Сбрасывает число постов в лентах и время ближайшей публикации.
+
+    Время пересчитывается, только если пост мог ждать публикации до
+    изменения или после него.
+    '''
+    bump_version('posts', PAGE_CACHE)
+    waits = kwargs['signal'] is post_save and _may_wait_for_publication(
+        instance.is_published, instance.is_visible
+    )
+    if waits or getattr(instance, '_was_waiting', False):
+        refresh_next_publication()
+
+
+def _post_page_tags(post):
+    '''Метки страниц поста; без запроса, если категория уже загружена.'''
+    category = Post._meta.get_field('category')
+    if post.category_id is None or category.is_cached(post):
+        return post_page_tags(post.pk, post.category and post.category.slug)
+    return post_tags([post.pk])
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    invalidate_pages(
+        getattr(instance, '_page_cache_tags', set())
+        | _post_page_tags(instance)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    '''Страницы поста известны с pre_delete: строки в базе уже нет.'''
+    invalidate_pages(
+        getattr(instance, '_page_cache_tags', set())
+        | post_page_tags(instance.pk)
+    )
+
+
+@receiver(posts_published)
+def invalidate_published_post_pages(sender, post_ids, **kwargs):
+    invalidate_pages(post_tags(post_ids))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    '''Комментарий меняет страницу поста и счётчик в карточках.'''
+    if _deleted_in_cascade(instance):
+        return
+    if Comment._meta.get_field('post').is_cached(instance):
+        invalidate_pages(_post_page_tags(instance.post))
+    else:
+        invalidate_pages(post_tags([instance.post_id]))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance, **kwargs):
+    instance._old_slug = None
+    if instance.pk:
+        instance._old_slug = Category.objects.filter(
+            pk=instance.pk
+        ).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    tags = {'feed', 'categories', category_tag(instance.slug)}
+    old_slug = getattr(instance, '_old_slug', None)
+    if old_slug:
+        tags.add(category_tag(old_slug))
+    invalidate_pages(tags)
+
+
+def _location_tags(location):
+    slugs = Post.objects.filter(
+        location=location, category__isnull=False
+    ).values_list('category__slug', flat=True).distinct()
+    return {'feed', 'locations', *(category_tag(slug) for slug in slugs)}
+
+
+@receiver(pre_delete, sender=Location)
+def remember_location_pages(sender, instance, **kwargs):
+    instance._page_cache_tags = _location_tags(instance)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    tags = getattr(instance, '_page_cache_tags', None)
+    invalidate_pages(tags or _location_tags(instance))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def forget_saved_post(sender, instance, **kwargs):
+    forget_posts((instance.pk,))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def forget_commented_post(sender, instance, **kwargs):
+    '''Счётчик и версия поста изменились вместе с комментарием.'''
+    if _deleted_in_cascade(instance):
+        return
+    forget_posts((instance.post_id,))
+
+
+@receiver(posts_published)
+def forget_published_posts(sender, post_ids, **kwargs):
+    forget_posts(post_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def forget_category_posts(sender, instance, **kwargs):
+    forget_related_posts('category', instance.pk)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def forget_location_posts(sender, instance, **kwargs):
+    forget_related_posts('location', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def forget_author_posts(sender, instance, **kwargs):
+    forget_related_posts('author', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_renditions(sender, instance, **kwargs):
+    '''Копии нового фото нарезаются в фоне, не задерживая ответ автору.'''
+    if not getattr(instance, '_image_uploaded', False):
+        return
+    instance._image_uploaded = False
+    job = enqueue(
+        'make_renditions', post_id=instance.pk, image=instance.image.name
+    )
+    if job is None:
+        # Задача уже выполнена и изменила запись поста.
+        instance.refresh_from_db(
+            fields=('has_renditions', 'version', 'updated_at')
+        )
@@ -0,0 +1,80 @@
+'''Фоновые задачи блога, см. blog.jobs.'''
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import render_to_string
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from blog.counters import recount_comment_counts
+from blog.images import make_renditions
+from blog.jobs import task
+from blog.models import Post
+from blog.page_cache import invalidate_pages, post_tags
+from blog.post_cache import forget_posts
+
+
+def renditions_ready(post_ids):
+    '''Переключает посты на уменьшенные копии фото.'''
+    post_ids = list(post_ids)
+    Post.objects.filter(pk__in=post_ids).touch(has_renditions=True)
+    forget_posts(post_ids)
+    invalidate_pages(post_tags(post_ids))
+
+
+@task('make_renditions')
+def make_post_renditions(post_id, image):
+    # Пост могли удалить или сменить фото, пока задача ждала очереди.
+    if not Post.objects.filter(pk=post_id, image=image).exists():
+        return
+    make_renditions(image)
+    renditions_ready(
+        Post.objects.filter(pk=post_id, image=image).values_list(
+            'pk', flat=True
+        )
+    )
+
+
+@task('recount_comments')
+def recount_comments():
+    recount_comment_counts()
+
+
+@task('send_email')
+def send_email(subject, body, from_email, to, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body is not None:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+@task('send_password_reset')
+def send_password_reset(user_id, email, domain, site_name, protocol,
+                        from_email, subject_template_name,
+                        email_template_name, html_email_template_name=None):
+    '''Письмо PasswordResetForm со ссылкой, собранной при отправке.'''
+    User = get_user_model()
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    # Токен зависит от адреса: после его смены письмо уже не нужно.
+    if user is None or getattr(user, User.get_email_field_name()) != email:
+        return
+    context = {
+        'email': email,
+        'domain': domain,
+        'site_name': site_name,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'user': user,
+        'token': default_token_generator.make_token(user),
+        'protocol': protocol,
+    }
+    subject = render_to_string(subject_template_name, context)
+    html_body = None
+    if html_email_template_name is not None:
+        html_body = render_to_string(html_email_template_name, context)
+    send_email(
+        ''.join(subject.splitlines()),
+        render_to_string(email_template_name, context),
+        from_email,
+        [email],
+        html_body,
+    )
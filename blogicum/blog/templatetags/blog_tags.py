@@ -0,0 +1,80 @@
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.holes import punch_hole, render_hole
+from blog.images import post_image_size, rendition_srcset, rendition_url
+from blog.page_cache import PAGE_CACHE
+
+POST_CARD_KEY = 'blog:post-card:{}:{}'
+
+register = template.Library()
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    '''Номера страниц вокруг текущей, первые и последние.
+
+    Пропуски обозначаются значением Paginator.ELLIPSIS.
+    '''
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends
+    )
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **kwargs):
+    '''Личный фрагмент страницы, см. blog.holes.
+
+    В страницах для общего кеша вместо фрагмента выводится метка.
+    '''
+    if context.get('punch_holes'):
+        return mark_safe(punch_hole(name, kwargs))
+    return mark_safe(render_hole(context.request, name, kwargs))
+
+
+def post_card_key(post):
+    return POST_CARD_KEY.format(post.pk, post.version)
+
+
+@register.simple_tag
+def post_cards(posts):
+    '''HTML карточек постов в исходном порядке.
+
+    Карточки берутся из кеша одним запросом по ключам с версией поста,
+    отрисовываются и сохраняются только отсутствующие. Старые версии
+    не удаляются: на них больше никто не ссылается.
+    '''
+    posts = list(posts)
+    cache = caches[PAGE_CACHE]
+    keys = [post_card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            missing[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+    if missing:
+        cache.set_many(missing, settings.BLOG_POST_CARD_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post, rendition):
+    '''Фото поста в WebP и JPEG/PNG нужного размера на выбор браузеру.
+
+    Размеры берутся из полей поста, файлы при выводе не открываются.
+    '''
+    context = {
+        'post': post,
+        'src': rendition_url(post, rendition),
+        'size': post_image_size(post, rendition),
+    }
+    if post.has_renditions:
+        context['srcset'] = rendition_srcset(post)
+        context['webp_srcset'] = rendition_srcset(post, webp=True)
+    return context
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload, TemporaryFileUploadHandler
+)
+
+
+class CappedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    '''Пишет загружаемые файлы во временный файл на диске.
+
+    Как только файл превышает BLOG_MAX_UPLOAD_SIZE, разбор запроса
+    прекращается: остаток тела не читается, и сервер обрывает
+    соединение. Имя поля попадает в request.rejected_uploads, чтобы
+    форма могла объяснить ошибку, если ответ всё же дойдёт до клиента.
+    '''
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.BLOG_MAX_UPLOAD_SIZE:
+            self.file.close()
+            rejected = getattr(self.request, 'rejected_uploads', [])
+            self.request.rejected_uploads = [*rejected, self.field_name]
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
@@ -14,6 +14,8 @@ post_related_urls = [
          views.CommentUpdateView.as_view(), name='edit_comment'),
     path('<int:pk>/delete_comment/<int:comment_id>/',
          views.CommentDeleteView.as_view(), name='delete_comment'),
+    path('<int:pk>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('<int:pk>/', views.PostDetailView.as_view(), name='post_detail'),
 ]
 
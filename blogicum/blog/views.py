@@ -1,9 +1,9 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, reverse
-from django.utils import timezone
 from django.urls import reverse_lazy
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
@@ -11,110 +11,145 @@ from django.views.generic import (
 from blog.models import Category, Comment, Post, User
 from blog.forms import CommentForm, PostForm, UserForm
 from blog.mixins import (
-    CommentUpdateDeleteMixin, PaginatorMixin,
-    PostUpdateDeleteMixin, IndexCategoryProfileMixin
+    CommentUpdateDeleteMixin, ConditionalGetMixin, IndexCategoryProfileMixin,
+    PageCacheMixin, PostUpdateDeleteMixin, RejectedUploadsMixin
 )
+from blog.page_cache import category_tag
+from blog.paginators import KeysetPaginator
+from blog.post_cache import get_post, get_post_or_404
 
 
-class IndexListView(IndexCategoryProfileMixin, ListView):
+class IndexListView(PageCacheMixin, IndexCategoryProfileMixin, ListView):
     '''Главная страница.'''
 
     template_name = 'blog/index.html'
+    # Допустимое число SQL-запросов страницы, проверяется тестами.
+    query_budget = 2
 
 
-class CategoryListView(LoginRequiredMixin, IndexCategoryProfileMixin,
-                       ListView):
+class CategoryListView(LoginRequiredMixin, PageCacheMixin,
+                       IndexCategoryProfileMixin, ListView):
     '''Страница отдельной категории.'''
 
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
+    query_budget = 3
+
+    def get_page_cache_tags(self):
+        return (category_tag(self.kwargs['category_slug']),)
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        category_slug = self.kwargs['category_slug']
-        return queryset.filter(
-            category__slug=category_slug,
-            pub_date__lte=timezone.now()
-        ).order_by('-pub_date').annotate(comment_count=Count('comments'))
+        self.category = get_object_or_404(
+            Category.objects.values('id', 'title', 'description'),
+            slug=self.kwargs['category_slug'],
+            is_published=True
+        )
+        return super().get_queryset().filter(category_id=self.category['id'])
+
+    def get_extra_state(self):
+        return self.category
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        category_slug = self.kwargs['category_slug']
-        category = get_object_or_404(
-            Category.objects.values('title', 'description'),
-            slug=category_slug,
-            is_published=True
-        )
-        context['category'] = category
+        context['category'] = self.category
         return context
 
 
-class ProfileListView(IndexCategoryProfileMixin, PaginatorMixin, ListView):
-    '''Страница профиля пользователя.'''
+class ProfileListView(IndexCategoryProfileMixin, ListView):
+    '''Страница профиля пользователя.
+
+    Автор видит все свои посты, включая неопубликованные и отложенные.
+    '''
 
     template_name = 'blog/profile.html'
     context_object_name = 'post_list'
-    ordering = '-pub_date'
+    query_budget = 3
+
+    def shows_unpublished(self):
+        return self.request.user.username == self.kwargs['username']
+
+    def get_queryset(self):
+        self.author = get_object_or_404(User, username=self.kwargs['username'])
+        return super().get_queryset().filter(author=self.author)
+
+    def get_extra_state(self):
+        return (
+            self.author.username,
+            self.author.get_full_name(),
+            self.author.is_staff,
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.author
-        return self.my_pagination(context)
+        return context
 
-    def get_queryset(self):
-        self.author = get_object_or_404(User, username=self.kwargs['username'])
-        queryset = super().get_queryset()
-        if self.request.user.username == self.kwargs['username']:
-            queryset = queryset.filter(author=self.author)
-            return Post.objects.select_related(
-                'location', 'category', 'author'
-            ).filter(
-                author=self.author
-            ).order_by('-pub_date').annotate(
-                comment_count=Count('comments')
-            )
-        return Post.objects.select_related(
-            'location', 'category', 'author'
-        ).filter(
-            author=self.author,
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
-        ).order_by('-pub_date').annotate(comment_count=Count('comments'))
-
-
-class PostDetailView(DetailView):
+
+class PostDetailView(PageCacheMixin, ConditionalGetMixin, DetailView):
     '''Страница отдельного поста.'''
 
     model = Post
     template_name = 'blog/detail.html'
+    query_budget = 2
+    comments_paginate_by = 20
 
-    def get_object(self, queryset=None):
-        post_id = self.kwargs.get('pk')
+    def get_page_cache_tags(self):
+        return (f'post:{self.kwargs["pk"]}', 'categories', 'locations')
+
+    def get_visible_posts(self, queryset=None):
+        '''Пост из URL, если пользователю можно его видеть.'''
         user = self.request.user
         queryset = queryset or self.get_queryset()
+        visible = Q(is_published=True)
         if user.is_authenticated:
-            post = queryset.filter(
-                Q(id=post_id) & (Q(author=user) | Q(is_published=True))
-            ).select_related('author').first()
-        else:
-            post = queryset.filter(
-                Q(id=post_id) & Q(is_published=True)
-            ).select_related('author').first()
-        if not post:
+            visible |= Q(author=user)
+        return queryset.filter(Q(id=self.kwargs.get('pk')) & visible)
+
+    def get_object(self, queryset=None):
+        post = get_post(self.kwargs['pk'])
+        if post is None or not (
+            post.is_published or post.author_id == self.request.user.id
+        ):
             raise Http404('Page was not found')
         return post
 
+    def get_page_state(self):
+        '''Версия поста растёт и при изменении его комментариев.'''
+        return self.get_visible_posts().values_list(
+            'version', 'updated_at'
+        ).first()
+
+    def get_rendered_state(self, context):
+        return self.object.version, self.object.updated_at
+
+    def is_page_shared(self):
+        '''Снятый с публикации пост видит только его автор.'''
+        return self.object.is_published
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments
-            .select_related('author')
-            .order_by('created_at')
-        )
+        context['comments'] = self.get_comments_page()
         return context
 
+    @classmethod
+    def get_comments_paginator(cls, post):
+        return KeysetPaginator(
+            post.comments.select_related('author'),
+            cls.comments_paginate_by,
+            ordering=('created_at', 'id'),
+        )
+
+    def get_comments_page(self):
+        paginator = self.get_comments_paginator(self.object)
+        return paginator.get_page(self.request.GET.get('cursor'))
+
+
+class PostCommentsView(PostDetailView):
+    '''Следующая порция комментариев поста для кнопки «Показать ещё».'''
+
+    template_name = 'includes/comment_list.html'
+
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     '''Редактирование страницы профиля пользователя.'''
@@ -138,7 +173,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(RejectedUploadsMixin, LoginRequiredMixin, CreateView):
     '''Страница написания поста.'''
 
     model = Post
@@ -154,7 +189,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(PostUpdateDeleteMixin, UpdateView):
+class PostUpdateView(RejectedUploadsMixin, PostUpdateDeleteMixin, UpdateView):
     '''Страница изменения поста.'''
 
 
@@ -163,6 +198,12 @@ class PostDeleteView(PostUpdateDeleteMixin, DeleteView):
 
     success_url = reverse_lazy('blog:index')
 
+    def get_context_data(self, **kwargs):
+        # Шаблон подтверждения показывает пост через form.instance.
+        context = super().get_context_data(**kwargs)
+        context['form'] = self.form_class(instance=self.object)
+        return context
+
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
     '''Страница написания комментария.'''
@@ -172,14 +213,21 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     pk_url_kwarg = 'pk'
 
     def get_success_url(self):
-        return reverse(
+        '''Порция комментариев, которая заканчивается новым.'''
+        url = reverse(
             'blog:post_detail',
             kwargs={'pk': self.object.post.pk},
         )
+        cursor = PostDetailView.get_comments_paginator(
+            self.object.post
+        ).cursor_ending_at(self.object)
+        if cursor:
+            url += '?' + urlencode({'cursor': cursor})
+        return f'{url}#comment_{self.object.id}'
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(Post, pk=self.kwargs['pk'])
+        form.instance.post = get_post_or_404(self.kwargs['pk'])
         return super().form_valid(form)
 
 
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -115,3 +116,129 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Качество JPEG для уменьшенных копий фото постов.
+BLOG_RENDITION_QUALITY = 82
+
+# Загрузки пишутся сразу во временный файл; слишком большой файл
+# перестаёт записываться на первом лишнем фрагменте.
+FILE_UPLOAD_HANDLERS = ['blog.uploads.CappedTemporaryFileUploadHandler']
+
+# Фото постов при загрузке: наибольший размер файла и число пикселей,
+# до каких ширины и высоты фото уменьшается и качество пересжатия JPEG.
+BLOG_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+BLOG_MAX_UPLOAD_PIXELS = 50_000_000
+BLOG_MAX_IMAGE_SIZE = (2560, 2560)
+BLOG_UPLOAD_QUALITY = 85
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blog': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+BLOG_CURSOR_PAGINATION = False
+
+PAGE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'pages',
+    },
+    # Общий для всех процессов кеш в базе; таблицу создаёт
+    # manage.py createcachetable.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'blog_page_cache',
+    },
+}
+
+# Кеш сессий общий для всех процессов сервера (file): cached_db хранит
+# сессию в кеше весь срок её жизни, и с locmem выход из аккаунта не
+# увидели бы процессы, закешировавшие сессию. locmem годится только для
+# сервера в один процесс.
+SESSION_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': PAGE_CACHE_BACKENDS[os.getenv('PAGE_CACHE_BACKEND', 'locmem')],
+    'sessions': SESSION_CACHE_BACKENDS[
+        os.getenv('SESSION_CACHE_BACKEND', 'file')
+    ],
+}
+
+# cached_db читает сессию из кеша и обращается к базе только при промахе.
+# signed_cookies хранит сессию в подписанной cookie и не обращается к базе
+# совсем, но такую сессию нельзя отозвать на сервере.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_ENGINE = SESSION_ENGINES[os.getenv('SESSION_BACKEND', 'cached_db')]
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+BLOG_PAGE_CACHE_TIMEOUT = 5 * 60
+
+# Кешировать страницы и для вошедших пользователей, отрисовывая для них
+# только личные фрагменты. Тогда контекст шаблона в ответ из кеша не
+# попадает, поэтому по умолчанию режим выключен.
+BLOG_DONUT_CACHE = os.getenv('BLOG_DONUT_CACHE') == '1'
+
+# Карточки постов кешируются по версии поста, поэтому срок можно брать
+# большим: устаревшая версия просто перестаёт запрашиваться.
+BLOG_POST_CARD_TIMEOUT = 24 * 60 * 60
+
+BLOG_POST_COUNT_TIMEOUT = 300
+
+# Кеш постов по первичному ключу: найденные посты и отсутствующие id.
+# Он хранится в кеше страниц. С locmem кеш у каждого процесса свой, и
+# изменение поста сбрасывает его только в изменившем процессе: остальные
+# показывают старую версию до конца срока. Сроки можно увеличить, только
+# если PAGE_CACHE_BACKEND общий для всех процессов.
+BLOG_POST_OBJECT_TIMEOUT = 10
+BLOG_MISSING_POST_TIMEOUT = 10
+
+# Защита кешированных страниц и счётчиков от одновременного пересчёта:
+# сколько секунд после срока отдавать устаревшее значение, на сколько
+# захватывать пересчёт, сколько ждать чужой пересчёт и коэффициент
+# досрочного истечения (0 — без досрочного истечения).
+BLOG_CACHE_STALE_TIMEOUT = 60
+BLOG_CACHE_LOCK_TIMEOUT = 10
+BLOG_CACHE_LOCK_WAIT = 1
+BLOG_CACHE_EARLY_EXPIRY_BETA = 1.0
+
+# Очередь фоновых задач (blog.jobs): сколько раз пробовать задачу, пауза
+# перед первым повтором (дальше вдвое больше), через сколько секунд
+# считать задачу брошенной и сколько хранить выполненные. В режиме
+# BLOG_JOBS_EAGER задачи выполняются сразу, без обработчика.
+BLOG_JOBS_EAGER = os.getenv('BLOG_JOBS_EAGER') == '1'
+BLOG_JOB_MAX_ATTEMPTS = 3
+BLOG_JOB_RETRY_DELAY = 30
+BLOG_JOB_TIMEOUT = 10 * 60
+BLOG_JOB_KEEP_DONE = 7 * 24 * 60 * 60
+
+BLOG_APPROXIMATE_COUNT_THRESHOLD = None
+
+BLOG_APPROXIMATE_COUNT_TIMEOUT = 60 * 60
@@ -2,10 +2,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.views import PasswordResetView
 from django.urls import include, path
 from django.urls.base import reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.forms import QueuedPasswordResetForm
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -19,6 +22,11 @@ urlpatterns = [
         ),
         name='registration',
     ),
+    path(
+        'auth/password_reset/',
+        PasswordResetView.as_view(form_class=QueuedPasswordResetForm),
+        name='password_reset',
+    ),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('blog.urls')),
 ]
@@ -1,5 +1,15 @@
 from django.shortcuts import render
 from django.http import HttpResponseServerError
+from django.views.generic import TemplateView
+
+from blog.mixins import PageCacheMixin
+
+
+class StaticPageView(PageCacheMixin, TemplateView):
+    '''Статическая страница, кешируемая целиком.'''
+
+    def get_page_cache_tags(self):
+        return ('static',)
 
 
 def page_not_found(request, exception):
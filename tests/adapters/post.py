@@ -33,6 +33,15 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "excerpt",
+            "is_visible",
+            "location_visible",
+            "comment_count",
+            "version",
+            "has_renditions",
+            "image_width",
+            "image_height",
+            "updated_at",
             "refresh_from_db",
         ]
 
@@ -41,6 +41,23 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_jobs():
+    '''Фоновые задачи выполняются сразу, как без обработчика очереди.'''
+    with override_settings(BLOG_JOBS_EAGER=True):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +380,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [q for q in queries if 'COUNT(' in q['sql'].upper()]
+
+
+def test_feed_count_is_cached_and_invalidated(
+        many_posts_with_published_locations, mixer, user_client
+):
+    response, count_queries = _count_queries(user_client, '/')
+    assert count_queries
+    response, count_queries = _count_queries(user_client, '/')
+    assert not count_queries, (
+        'Убедитесь, что общее число постов ленты берётся из кеша.'
+    )
+    assert response.context['paginator'].count == len(
+        many_posts_with_published_locations
+    )
+
+    post = many_posts_with_published_locations[0]
+    mixer.blend(
+        Post, author=post.author, category=post.category,
+        pub_date=post.pub_date,
+    )
+    response, count_queries = _count_queries(user_client, '/')
+    assert count_queries, (
+        'Убедитесь, что кеш числа постов сбрасывается при изменении постов.'
+    )
+    assert response.context['paginator'].count == len(
+        many_posts_with_published_locations
+    ) + 1
+
+
+def test_large_count_is_approximate(
+        many_posts_with_published_locations, mixer, user_client
+):
+    with override_settings(BLOG_APPROXIMATE_COUNT_THRESHOLD=5):
+        user_client.get('/')
+        post = many_posts_with_published_locations[0]
+        mixer.blend(
+            Post, author=post.author, category=post.category,
+            pub_date=post.pub_date,
+        )
+        response, count_queries = _count_queries(user_client, '/')
+    assert not count_queries
+    assert response.context['paginator'].count == len(
+        many_posts_with_published_locations
+    )
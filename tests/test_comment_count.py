@@ -0,0 +1,107 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        post_with_published_location, user_client, user
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что создание комментария увеличивает счётчик'
+        ' комментариев поста.'
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что удаление комментария уменьшает счётчик'
+        ' комментариев поста.'
+    )
+
+
+def test_comment_count_follows_bulk_delete(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_stale_post_save_keeps_comment_count(
+        mixer, post_with_published_location
+):
+    stale = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.cycle(2).blend(
+        Comment, post=post_with_published_location, text='Комментарий'
+    )
+    stale.title = 'Новый заголовок'
+    stale.save()
+    fresh = Post.objects.get(pk=stale.pk)
+    assert fresh.comment_count == 2, (
+        'Убедитесь, что сохранение поста, загруженного до новых'
+        ' комментариев, не откатывает счётчик комментариев.'
+    )
+    assert fresh.title == 'Новый заголовок'
+    assert fresh.version == stale.version
+
+
+def test_recount_comments_repairs_counters(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+def test_post_delete_skips_per_comment_updates(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(50).blend(Comment, post=post, text='Комментарий')
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    updates = [q for q in queries if q['sql'].startswith('UPDATE')]
+    assert not updates, (
+        'Убедитесь, что при удалении поста его комментарии не обновляют'
+        ' счётчик по одному.'
+    )
+    assert len(queries) < 20
+
+
+def test_user_delete_recounts_commented_posts_once(
+        mixer, post_with_published_location, another_user
+):
+    post = post_with_published_location
+    mixer.cycle(50).blend(
+        Comment, post=post, author=another_user, text='Комментарий'
+    )
+    mixer.blend(Comment, post=post, text='Комментарий')
+    with CaptureQueriesContext(connection) as queries:
+        another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+    updates = [
+        q for q in queries if q['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1, (
+        'Убедитесь, что при удалении пользователя счётчик каждого'
+        ' прокомментированного им поста пересчитывается один раз.'
+    )
+    assert len(queries) < 20
@@ -0,0 +1,64 @@
+import pytest
+
+from blog.models import Comment
+from blog.views import PostDetailView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comments_are_paginated_with_load_more(
+        mixer, post_with_published_location, client
+):
+    post = post_with_published_location
+    per_page = PostDetailView.comments_paginate_by
+    comments = mixer.cycle(per_page + 5).blend(Comment, post=post)
+
+    response = client.get(f'/posts/{post.id}/')
+    first_batch = response.context['comments']
+    assert len(first_batch) == per_page, (
+        'Убедитесь, что на странице поста выводится только первая порция'
+        ' комментариев.'
+    )
+    assert first_batch.has_next()
+    assert f'/posts/{post.id}/comments/?cursor=' in response.content.decode()
+
+    fragment = client.get(
+        f'/posts/{post.id}/comments/', {'cursor': first_batch.next_cursor}
+    )
+    assert fragment.status_code == 200
+    assert b'<html' not in fragment.content
+    second_batch = fragment.context['comments']
+    assert not second_batch.has_next()
+    shown = [c.id for c in first_batch] + [c.id for c in second_batch]
+    assert shown == sorted(c.id for c in comments)
+
+
+def test_comments_fragment_hides_unpublished_post(
+        mixer, post_with_published_location, client
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('older', (0, PostDetailView.comments_paginate_by + 5))
+def test_new_comment_redirects_to_its_page(
+        mixer, post_with_published_location, user_client, older
+):
+    post = post_with_published_location
+    mixer.cycle(older).blend(Comment, post=post)
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Новый комментарий'}
+    )
+    comment = Comment.objects.latest('id')
+    assert response.url.endswith(f'#comment_{comment.id}'), (
+        'Убедитесь, что после отправки комментария пользователь попадает'
+        ' к якорю нового комментария.'
+    )
+    page = user_client.get(response.url).context['comments']
+    assert page[-1].id == comment.id, (
+        'Убедитесь, что после отправки комментария открывается порция'
+        ' комментариев, в которой есть новый.'
+    )
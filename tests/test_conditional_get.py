@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from django.utils.http import http_date
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _urls(post):
+    return (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    )
+
+
+def test_unchanged_pages_answer_not_modified(
+        post_with_published_location, user_client
+):
+    for url in _urls(post_with_published_location):
+        # Первый ответ выставляет CSRF-cookie, от которой зависит ETag.
+        user_client.get(url)
+        response = user_client.get(url)
+        assert response.has_header('ETag'), url
+        repeated = user_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeated.status_code == 304, (
+            f'Убедитесь, что страница {url} отвечает 304 Not Modified на'
+            ' запрос с актуальным ETag.'
+        )
+        assert not repeated.templates, (
+            'Ответ 304 должен формироваться без отрисовки шаблонов.'
+        )
+
+    detail_url = f'/posts/{post_with_published_location.id}/'
+    response = user_client.get(detail_url)
+    since = user_client.get(
+        detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert since.status_code == 304
+
+
+def test_list_pages_ignore_if_modified_since(
+        mixer, post_with_published_location, post_of_another_author,
+        user_client
+):
+    '''Удаление поста не меняет updated_at оставшихся на странице.'''
+    post = post_with_published_location
+    urls = _urls(post)[:3]
+    for url in urls:
+        assert not user_client.get(url).has_header('Last-Modified'), (
+            f'Убедитесь, что страница списка {url} не отдаёт Last-Modified.'
+        )
+    post_of_another_author.delete()
+    since = http_date(time.time() + 60)
+    for url in urls:
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200, url
+
+
+def test_changes_refresh_etag(
+        mixer, post_with_published_location, user_client
+):
+    post = post_with_published_location
+    user_client.get(f'/posts/{post.id}/')
+    etags = {url: user_client.get(url)['ETag'] for url in _urls(post)}
+    mixer.blend(Comment, post=post)
+    for url, etag in etags.items():
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что после нового комментария страница {url}'
+            ' отдаётся заново.'
+        )
+
+
+def test_cached_anonymous_page_answers_not_modified(
+        post_with_published_location, client
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    assert client.get(url)['X-Page-Cache'] == 'HIT'
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
@@ -0,0 +1,91 @@
+import base64
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, {'cursor': cursor})
+        assert response.status_code == 200
+        assert not any(
+            'COUNT(*)' in query['sql'].upper() for query in queries
+        ), 'Курсорная пагинация не должна выполнять COUNT-запросы.'
+        assert not any(
+            'OFFSET' in query['sql'].upper() for query in queries
+        ), 'Курсорная пагинация не должна использовать OFFSET.'
+        page_obj = response.context['page_obj']
+        assert len(page_obj) <= N_PER_PAGE
+        seen.extend(post.id for post in page_obj)
+        cursor = page_obj.next_cursor
+    return seen
+
+
+def test_cursor_pages_cover_feed_once(
+        many_posts_with_published_locations, user_client
+):
+    seen = _walk_cursor_pages(user_client, '/')
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    assert seen == [post.id for post in expected], (
+        'Убедитесь, что курсорная пагинация показывает каждый пост ровно'
+        ' один раз в порядке убывания даты публикации.'
+    )
+
+
+def test_cursor_newer_link_returns_previous_page(
+        many_posts_with_published_locations, user_client
+):
+    first = user_client.get('/', {'cursor': ''}).context['page_obj']
+    second = user_client.get(
+        '/', {'cursor': first.next_cursor}
+    ).context['page_obj']
+    assert second.has_previous()
+    back = user_client.get(
+        '/', {'cursor': second.previous_cursor}
+    ).context['page_obj']
+    assert [post.id for post in back] == [post.id for post in first]
+    assert not back.has_previous()
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.mark.parametrize('cursor', (
+    'not-a-cursor',
+    _cursor(['older', [None, None]]),
+    _cursor(['older', ['2020-01-01T00:00:00', 10 ** 30]]),
+    _cursor(['newer', ['2020-01-01T00:00:00', -10 ** 30]]),
+))
+def test_invalid_cursor_falls_back_to_first_page(
+        many_posts_with_published_locations, user_client, cursor
+):
+    response = user_client.get('/', {'cursor': cursor})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == N_PER_PAGE
+
+
+@pytest.mark.parametrize('cursor', (
+    _cursor(['older', [None, None]]),
+    _cursor(['older', ['2020-01-01T00:00:00', 10 ** 30]]),
+))
+@pytest.mark.parametrize('url', ('/posts/{id}/', '/posts/{id}/comments/'))
+def test_invalid_comment_cursor_falls_back_to_first_page(
+        post_with_published_location, client, cursor, url
+):
+    url = url.format(id=post_with_published_location.id)
+    response = client.get(url, {'cursor': cursor})
+    assert response.status_code == 200
@@ -0,0 +1,59 @@
+import pytest
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def donut_cache(settings):
+    settings.BLOG_DONUT_CACHE = True
+
+
+def test_logged_in_readers_share_cached_page(
+        donut_cache, mixer, post_with_published_location, user,
+        user_client, another_user, another_user_client, client
+):
+    post = post_with_published_location
+    mixer.blend(Comment, post=post, author=user)
+    url = f'/posts/{post.id}/'
+    edit_url = f'/posts/{post.id}/edit/'
+
+    own = user_client.get(url)
+    assert own['X-Page-Cache'] == 'MISS'
+    own_content = own.content.decode()
+    assert edit_url in own_content
+    assert f'>{user.username}</a>' in own_content
+
+    other = another_user_client.get(url)
+    assert other['X-Page-Cache'] == 'HIT', (
+        'Убедитесь, что страница, отрисованная для одного пользователя,'
+        ' берётся из кеша для другого.'
+    )
+    other_content = other.content.decode()
+    assert f'>{another_user.username}</a>' in other_content
+    assert f'>{user.username}</a>' not in other_content
+    assert edit_url not in other_content, (
+        'Ссылки автора поста должны отрисовываться для каждого'
+        ' пользователя отдельно.'
+    )
+    assert 'csrfmiddlewaretoken' in other_content
+    assert '<!--hole:' not in other_content
+
+    anonymous = client.get(url).content.decode()
+    assert 'csrfmiddlewaretoken' not in anonymous
+    assert '/auth/login/' in anonymous
+
+
+def test_unpublished_post_is_not_shared(
+        donut_cache, post_with_published_location, user_client
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    user_client.get(f'/posts/{post.id}/')
+    response = user_client.get(f'/posts/{post.id}/')
+    assert response.get('X-Page-Cache') != 'HIT', (
+        'Снятый с публикации пост виден только автору, и его страница не'
+        ' должна попадать в общий кеш.'
+    )
@@ -0,0 +1,36 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_excerpt_is_stored_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = ' '.join(str(number) for number in range(20))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == '0 1 2 3 4 5 6 7 8 9 …'
+
+
+def test_feed_does_not_fetch_full_text(post_with_published_location, client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/')
+    assert post_with_published_location.excerpt in response.content.decode()
+    assert not [
+        query for query in queries
+        if '"blog_post"."text"' in query['sql']
+    ], 'Убедитесь, что лента не выбирает полный текст постов.'
+
+
+def test_backfill_excerpts(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt='')
+    call_command('backfill_excerpts', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt
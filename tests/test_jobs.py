@@ -0,0 +1,144 @@
+import re
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog import jobs
+from blog.models import Job, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def queued_jobs(settings, tmp_path):
+    settings.BLOG_JOBS_EAGER = False
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def failing_task(monkeypatch):
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError('сбой')
+
+    monkeypatch.setitem(jobs.tasks, 'fail', (fail, 2))
+    return calls
+
+
+def _run_worker():
+    out = StringIO()
+    call_command('run_worker', once=True, stdout=out, stderr=StringIO())
+    return out.getvalue()
+
+
+def test_renditions_are_made_by_worker(post_with_published_location):
+    post = post_with_published_location
+    buffer = BytesIO()
+    Image.new('RGB', (800, 600), 'blue').save(buffer, 'JPEG')
+    post.image = SimpleUploadedFile('photo.jpg', buffer.getvalue())
+    post.save()
+    assert not post.has_renditions, (
+        'Убедитесь, что копии фото нарезаются в фоне, а не при сохранении.'
+    )
+    job = Job.objects.get(
+        name='make_renditions', payload__image=post.image.name
+    )
+    assert job.status == Job.QUEUED
+
+    _run_worker()
+    job.refresh_from_db()
+    post.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.duration is not None
+    assert post.has_renditions
+
+    out = StringIO()
+    call_command('job_stats', stdout=out)
+    assert 'make_renditions: в очереди 0' in out.getvalue()
+
+
+def test_failed_job_is_retried_with_backoff(failing_task):
+    job = jobs.enqueue('fail')
+    _run_worker()
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.attempts == 1
+    assert job.run_after > timezone.now(), (
+        'Убедитесь, что упавшая задача повторяется не сразу.'
+    )
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    _run_worker()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+    assert 'сбой' in job.last_error
+    assert len(failing_task) == 2
+
+
+def test_stuck_job_is_requeued(failing_task):
+    job = jobs.enqueue('fail')
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.RUNNING,
+        attempts=1,
+        started_at=timezone.now() - timedelta(hours=1),
+    )
+    assert jobs.requeue_stuck_jobs() == 1
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+
+
+def test_job_is_claimed_once(failing_task):
+    jobs.enqueue('fail')
+    assert jobs.claim_job() is not None
+    assert jobs.claim_job() is None
+
+
+def test_password_reset_email_is_queued(user, client):
+    user.email = 'author@example.com'
+    user.save()
+    response = client.post(
+        '/auth/password_reset/', {'email': user.email}
+    )
+    assert response.status_code == 302
+    assert not mail.outbox, (
+        'Убедитесь, что письмо для сброса пароля отправляет фоновая задача.'
+    )
+    job = Job.objects.get(name='send_password_reset')
+    assert '/reset/' not in repr(job.payload), (
+        'Убедитесь, что ссылка для сброса пароля не хранится в очереди.'
+    )
+    _run_worker()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [user.email]
+    link = re.search(r'/auth/reset/\S+', mail.outbox[0].body).group()
+    assert client.get(link).status_code == 302, (
+        'Убедитесь, что ссылка из письма сбрасывает пароль.'
+    )
+
+
+def test_recount_comments_in_background(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(comment_count=5)
+    call_command('recount_comments', background=True, stdout=StringIO())
+    _run_worker()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_admin_hides_job_payload(admin_client, failing_task):
+    job = jobs.enqueue('fail')
+    Job.objects.filter(pk=job.pk).update(payload={'secret': 'значение'})
+    response = admin_client.get(f'/admin/blog/job/{job.pk}/change/')
+    assert response.status_code == 200
+    assert 'значение' not in response.content.decode(), (
+        'Убедитесь, что аргументы задач не видны в админке.'
+    )
@@ -0,0 +1,139 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+@pytest.mark.parametrize('url', ('/', '/posts/{post.id}/'))
+def test_anonymous_pages_are_cached(
+        post_with_published_location, client, url
+):
+    url = url.format(post=post_with_published_location)
+    first, _ = _get(client, url)
+    second, queries = _get(client, url)
+    assert second['X-Page-Cache'] == 'HIT'
+    assert queries == 0, (
+        'Убедитесь, что повторный анонимный запрос страницы не обращается'
+        ' к базе данных.'
+    )
+    assert second.content == first.content
+
+
+def test_logged_in_pages_are_not_cached(
+        post_with_published_location, user_client
+):
+    _get(user_client, '/')
+    response, queries = _get(user_client, '/')
+    assert 'X-Page-Cache' not in response
+    assert queries
+
+
+def test_comment_invalidates_only_affected_pages(
+        mixer, post_with_published_location, post_of_another_author, client
+):
+    post = post_with_published_location
+    other_url = f'/posts/{post_of_another_author.id}/'
+    for url in ('/', f'/posts/{post.id}/', other_url):
+        _get(client, url)
+
+    comment = mixer.blend(Comment, post=post, text='Новый комментарий')
+    index, _ = _get(client, '/')
+    detail, _ = _get(client, f'/posts/{post.id}/')
+    other, _ = _get(client, other_url)
+    assert index['X-Page-Cache'] == 'MISS'
+    assert detail['X-Page-Cache'] == 'MISS'
+    assert comment.text in detail.content.decode()
+    assert other['X-Page-Cache'] == 'HIT', (
+        'Убедитесь, что комментарий сбрасывает кеш только тех страниц,'
+        ' на которых выводится его пост.'
+    )
+
+
+
+def test_user_delete_invalidates_commented_post_pages(
+        mixer, post_with_published_location, another_user, client
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(
+        Comment, post=post, author=another_user, text='Удалённый автор'
+    )
+    url = f'/posts/{post.id}/'
+    _get(client, url)
+    another_user.delete()
+    response, _ = _get(client, url)
+    assert 'Удалённый автор' not in response.content.decode(), (
+        'Убедитесь, что удаление пользователя сбрасывает кеш страниц'
+        ' постов, которые он комментировал.'
+    )
+
+
+def test_rename_invalidates_authored_and_commented_pages(
+        mixer, post_with_published_location, post_of_another_author,
+        another_user, client
+):
+    authored = post_of_another_author
+    commented = post_with_published_location
+    mixer.blend(
+        Comment, post=commented, author=another_user, text='Комментарий'
+    )
+    urls = ('/', f'/posts/{authored.id}/', f'/posts/{commented.id}/')
+    for url in urls:
+        _get(client, url)
+    another_user.username = 'renamed_user'
+    another_user.save()
+    for url in urls:
+        response, _ = _get(client, url)
+        assert '@renamed_user' in response.content.decode(), (
+            'Убедитесь, что после смены имени пользователя страницы его'
+            ' постов и прокомментированных им постов показывают новое имя.'
+        )
+
+def test_post_change_invalidates_feed(post_with_published_location, client):
+    post = post_with_published_location
+    _get(client, '/')
+    post.title = 'Новый заголовок'
+    post.save()
+    response, _ = _get(client, '/')
+    assert 'Новый заголовок' in response.content.decode()
+
+
+@pytest.mark.parametrize('command, stale', (
+    ('backfill_excerpts', {'excerpt': ''}),
+    ('recount_comments', {'comment_count': 42}),
+))
+def test_maintenance_commands_invalidate_pages(
+        post_with_published_location, client, command, stale
+):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(**stale)
+    urls = ('/', f'/posts/{post.id}/')
+    for url in urls:
+        _get(client, url)
+    call_command(command, stdout=StringIO())
+    for url in urls:
+        response, _ = _get(client, url)
+        assert response['X-Page-Cache'] == 'MISS', (
+            f'Убедитесь, что команда {command} сбрасывает кеш страниц'
+            ' исправленных постов.'
+        )
+
+
+def test_page_cache_stats(post_with_published_location, client):
+    _get(client, '/')
+    _get(client, '/')
+    out = StringIO()
+    call_command('page_cache_stats', stdout=out)
+    assert 'Попаданий: 1, промахов: 1' in out.getvalue()
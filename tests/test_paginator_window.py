@@ -0,0 +1,33 @@
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+
+from blog.caching import PAGE_CACHE
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _feed_size(client, user, category, n_posts):
+    Post.objects.all().delete()
+    caches[PAGE_CACHE].clear()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {i}', text='Текст', author=user, category=category,
+            pub_date=timezone.now(), is_visible=True,
+        )
+        for i in range(n_posts)
+    )
+    response = client.get('/', {'page': n_posts // N_PER_PAGE // 2})
+    assert response.context['paginator'].num_pages == n_posts // N_PER_PAGE
+    return len(response.content)
+
+
+def test_paginator_renders_bounded_window(client, user, published_category):
+    small = _feed_size(client, user, published_category, N_PER_PAGE * 10)
+    large = _feed_size(client, user, published_category, N_PER_PAGE * 200)
+    assert large - small < 200, (
+        'Убедитесь, что пагинатор выводит ограниченное окно страниц, а не'
+        ' ссылку на каждую страницу.'
+    )
@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import PAGE_CACHE
+from blog.models import Comment, Post
+from blog.post_cache import POST_KEY, get_post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _post_selects(post_id):
+    with CaptureQueriesContext(connection) as queries:
+        post = get_post(post_id)
+    return post, len(queries)
+
+
+def test_post_is_read_through_cache(mixer, post_with_published_location):
+    post = post_with_published_location
+    cached, queries = _post_selects(post.id)
+    assert queries == 1
+    cached, queries = _post_selects(post.id)
+    assert queries == 0, 'Убедитесь, что повторно пост берётся из кеша.'
+    assert cached.category.title == post.category.title
+
+    mixer.blend(Comment, post=post)
+    cached, _ = _post_selects(post.id)
+    assert cached.comment_count == 1
+
+    post.category.title = 'Новое название'
+    post.category.save()
+    cached, _ = _post_selects(post.id)
+    assert cached.category.title == 'Новое название', (
+        'Убедитесь, что изменение категории сбрасывает кеш её постов.'
+    )
+
+
+def test_missing_posts_are_cached(mixer, user, published_category):
+    missing_id = 1000
+    assert _post_selects(missing_id) == (None, 1)
+    assert _post_selects(missing_id) == (None, 0), (
+        'Убедитесь, что отсутствующий пост тоже кешируется.'
+    )
+    mixer.blend(
+        'blog.Post', id=missing_id, author=user, category=published_category
+    )
+    post, _ = _post_selects(missing_id)
+    assert post is not None and post.id == missing_id
+
+
+def test_probing_missing_posts_skips_database(client):
+    client.get('/posts/1000/')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/posts/1000/')
+    assert response.status_code == 404
+    assert not queries, (
+        'Убедитесь, что повторный запрос несуществующего поста не'
+        ' обращается к базе данных.'
+    )
+
+
+def test_edit_page_reads_post_from_database(
+        post_with_published_location, user_client
+):
+    '''Изменение в другом процессе не сбрасывает локальный кеш.'''
+    post = post_with_published_location
+    get_post(post.id)
+    Post.objects.filter(pk=post.pk).update(title='Изменён в другом процессе')
+    response = user_client.get(f'/posts/{post.id}/edit/')
+    assert response.context['form'].instance.title == (
+        'Изменён в другом процессе'
+    ), 'Убедитесь, что страница правки поста не берёт пост из кеша.'
+
+
+def test_post_cache_is_kept_with_pages(post_with_published_location):
+    '''Страница из общего кеша не собирается из поста одного процесса.'''
+    post = post_with_published_location
+    get_post(post.id)
+    assert caches[PAGE_CACHE].get(POST_KEY.format(post.id)), (
+        'Убедитесь, что кеш постов хранится в кеше страниц.'
+    )
+    caches['default'].clear()
+    assert _post_selects(post.id)[1] == 0
@@ -0,0 +1,61 @@
+import pytest
+from django.template.loader import render_to_string
+
+from blog.models import Comment, Post
+from blog.templatetags import blog_tags
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def rendered_cards(monkeypatch):
+    '''Список постов, карточки которых пришлось отрисовать заново.'''
+    rendered = []
+
+    def render(template_name, context=None, *args, **kwargs):
+        if template_name == 'includes/post_card.html':
+            rendered.append(context['post'].pk)
+        return render_to_string(template_name, context, *args, **kwargs)
+
+    monkeypatch.setattr(blog_tags, 'render_to_string', render)
+    return rendered
+
+
+def test_post_cards_are_shared_between_pages(
+        post_with_published_location, user_client, rendered_cards
+):
+    post = post_with_published_location
+    user_client.get('/')
+    user_client.get(f'/category/{post.category.slug}/')
+    response = user_client.get(f'/profile/{post.author.username}/')
+    assert rendered_cards == [post.pk], (
+        'Убедитесь, что карточка поста отрисовывается один раз и'
+        ' используется лентой, страницей категории и профилем.'
+    )
+    assert post.title in response.content.decode()
+
+
+def test_post_card_follows_related_changes(
+        mixer, post_with_published_location, user_client, rendered_cards
+):
+    post = post_with_published_location
+    user_client.get('/')
+
+    mixer.blend(Comment, post=post)
+    assert 'Комментарии (1)' in user_client.get('/').content.decode()
+
+    post.category.title = 'Новое название категории'
+    post.category.save()
+    assert 'Новое название категории' in (
+        user_client.get('/').content.decode()
+    )
+
+    post.location.is_published = False
+    post.location.save()
+    assert 'Планета Земля' in user_client.get('/').content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title='Тихое изменение')
+    assert 'Тихое изменение' not in user_client.get('/').content.decode(), (
+        'Карточка должна обновляться только при смене версии поста.'
+    )
+    assert rendered_cards == [post.pk] * 4
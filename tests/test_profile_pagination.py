@@ -0,0 +1,34 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('as_owner', (True, False))
+def test_profile_respects_requested_page(
+        many_posts_with_published_locations, user, user_client,
+        unlogged_client, as_owner
+):
+    client = user_client if as_owner else unlogged_client
+    url = f'/profile/{user.username}/'
+    first_page = client.get(url).context['page_obj']
+    with CaptureQueriesContext(connection) as queries:
+        second_page = client.get(url, {'page': 2}).context['page_obj']
+    assert second_page.number == 2, (
+        'Убедитесь, что страница профиля учитывает параметр page.'
+    )
+    assert len(second_page) == N_PER_PAGE
+    assert not {post.id for post in first_page} & {
+        post.id for post in second_page
+    }
+    post_selects = [
+        query for query in queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "blog_post"' in query['sql']
+    ]
+    assert len(post_selects) <= 2, (
+        'Убедитесь, что посты профиля пагинируются одним запросом к базе.'
+    )
@@ -0,0 +1,57 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from blog.models import Comment, Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_view_queries(url, user):
+    '''Выполняет представление без сессии и считает только его запросы.'''
+    match = resolve(url)
+    request = RequestFactory().get(url)
+    request.user = user
+    with CaptureQueriesContext(connection) as queries:
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    assert response.status_code == 200, url
+    return len(queries), match.func.view_class.query_budget
+
+
+def _budget_urls(post):
+    return (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+        f'/posts/{post.id}/comments/',
+    )
+
+
+@pytest.mark.parametrize('n_posts', (1, N_PER_PAGE * 2))
+def test_pages_stay_within_query_budget(
+        mixer, user, published_category, published_locations, n_posts
+):
+    posts = mixer.cycle(n_posts).blend(
+        Post,
+        author=user,
+        category=published_category,
+        location=mixer.sequence(*published_locations),
+    )
+    mixer.cycle(3).blend(Comment, post=posts[0])
+    for url in _budget_urls(posts[0]):
+        for viewer in (AnonymousUser(), user):
+            if 'category' in url and not viewer.is_authenticated:
+                continue
+            used, budget = _count_view_queries(url, viewer)
+            assert used <= budget, (
+                f'Страница {url} выполнила {used} SQL-запросов при'
+                f' допустимых {budget}. Проверьте, что связанные объекты'
+                ' загружаются через select_related.'
+            )
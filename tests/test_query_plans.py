@@ -0,0 +1,89 @@
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.models import Comment
+from blog.views import (
+    CategoryListView, IndexListView, PostDetailView, ProfileListView
+)
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+BAD_PLAN_STEPS = re.compile(r'\bSCAN\b|TEMP B-TREE')
+
+# Обходы, которые допустимы для отдельных запросов. Лента читает
+# частичный индекс видимых постов по порядку и останавливается по LIMIT;
+# COUNT видимых постов обходит частичный индекс, а не таблицу.
+ALLOWED_PLAN_STEPS = {
+    'лента': {'SCAN blog_post USING INDEX post_visible_feed_idx'},
+    'количество постов в ленте': {
+        'SCAN blog_post USING INDEX post_visible_feed_idx',
+        'SCAN blog_post USING INDEX post_category_feed_idx',
+    },
+}
+
+
+def _view_queryset(view_cls, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_cls()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def _query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _assert_indexed(name, queryset):
+    plan = _query_plan(queryset)
+    allowed = ALLOWED_PLAN_STEPS.get(name, set())
+    bad_steps = [
+        step for step in plan
+        if BAD_PLAN_STEPS.search(step) and step not in allowed
+    ]
+    assert not bad_steps, (
+        f'Запрос «{name}» выполняется без подходящего индекса: '
+        f'{"; ".join(plan)}'
+    )
+
+
+def test_hot_queries_use_indexes(
+        mixer, post_with_published_location, user
+):
+    post = post_with_published_location
+    comment = mixer.blend(Comment, post=post)
+    comments = PostDetailView.get_comments_paginator(post)
+    cursor = [comment.created_at, comment.id]
+    anonymous = AnonymousUser()
+    feed = _view_queryset(IndexListView, anonymous)
+    category = _view_queryset(
+        CategoryListView, anonymous, category_slug=post.category.slug
+    )
+    public_profile = _view_queryset(
+        ProfileListView, anonymous, username=user.username
+    )
+    owner_profile = _view_queryset(
+        ProfileListView, user, username=user.username
+    )
+    hot_queries = {
+        'лента': feed[:N_PER_PAGE],
+        'количество постов в ленте': feed.order_by().values('pk'),
+        'страница категории': category[:N_PER_PAGE],
+        'профиль': public_profile[:N_PER_PAGE],
+        'профиль автора': owner_profile[:N_PER_PAGE],
+        'комментарии поста': comments.page_queryset(),
+        'следующие комментарии поста': comments.page_queryset(cursor),
+        'предыдущие комментарии поста': comments.page_queryset(
+            cursor, backwards=True
+        ),
+    }
+    for name, queryset in hot_queries.items():
+        _assert_indexed(name, queryset)
@@ -0,0 +1,166 @@
+import re
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import RENDITIONS, rendition_name
+from blog.models import Post
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _jpeg(name='photo.jpg', size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@pytest.mark.django_db
+def test_renditions_are_made_on_upload(post_with_published_location, client):
+    post = post_with_published_location
+    post.image = _jpeg()
+    post.save()
+    assert post.has_renditions
+    for rendition, (width, height) in RENDITIONS.items():
+        for webp in (False, True):
+            name = rendition_name(post.image.name, rendition, webp)
+            assert default_storage.exists(name), (
+                'Убедитесь, что при загрузке фото создаётся копия'
+                f' «{rendition}» в форматах JPEG и WebP.'
+            )
+            with default_storage.open(name) as file:
+                image = Image.open(file)
+                assert image.width <= width and image.height <= height
+    content = client.get('/').content.decode()
+    assert rendition_name(post.image.name, 'card') in content, (
+        'Убедитесь, что карточка поста в ленте показывает копию «card».'
+    )
+    assert rendition_name(post.image.name, 'card', webp=True) in content, (
+        'Убедитесь, что карточка поста предлагает браузеру копию в WebP.'
+    )
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert rendition_name(post.image.name, 'detail') in content
+
+
+@pytest.mark.django_db
+def test_post_without_renditions_shows_original(
+        post_with_published_location, client
+):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(has_renditions=False)
+    content = client.get('/').content.decode()
+    assert post.image.url in content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_make_renditions_command(post_with_published_location):
+    post = post_with_published_location
+    post.image = _jpeg()
+    post.save()
+    for rendition in RENDITIONS:
+        default_storage.delete(rendition_name(post.image.name, rendition))
+    Post.objects.filter(pk=post.pk).update(has_renditions=False)
+
+    out = StringIO()
+    call_command('make_renditions', processes=2, stdout=out)
+    assert 'Обработано фото: 1, ошибок: 0' in out.getvalue()
+    post.refresh_from_db()
+    assert post.has_renditions
+    assert default_storage.exists(rendition_name(post.image.name, 'card'))
+
+
+@pytest.mark.django_db
+def test_image_size_is_rendered_without_opening_files(
+        post_with_published_location, client, monkeypatch
+):
+    post = post_with_published_location
+    post.image = _jpeg(size=(2000, 1000))
+    post.save()
+    assert (post.image_width, post.image_height) == (2000, 1000)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('Фото открыто при выводе страницы.')
+
+    monkeypatch.setattr(Image, 'open', fail)
+    pages = (
+        ('/', (640, 320)),
+        (f'/posts/{post.id}/', (1280, 640)),
+        (f'/posts/{post.id}/delete/', (1280, 640)),
+    )
+    client.force_login(post.author)
+    for url, size in pages:
+        soup = BeautifulSoup(client.get(url).content, features='html.parser')
+        img = soup.find('img', src=re.compile('post_images/'))
+        assert (int(img['width']), int(img['height'])) == size, (
+            'Убедитесь, что у фото поста указаны ширина и высота копии.'
+        )
+        assert img['loading'] == 'lazy' and img['decoding'] == 'async', (
+            'Убедитесь, что фото поста загружаются отложенно.'
+        )
+
+
+@pytest.mark.django_db
+def test_backfill_image_sizes_command(post_with_published_location):
+    post = post_with_published_location
+    post.image = _jpeg(size=(300, 200))
+    post.save()
+    Post.objects.filter(pk=post.pk).update(
+        image_width=None, image_height=None
+    )
+
+    out = StringIO()
+    call_command('backfill_image_sizes', stdout=out)
+    assert 'Сохранено размеров: 1, ошибок: 0' in out.getvalue()
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (300, 200)
+
+
+@pytest.mark.django_db
+def test_backfill_image_sizes_skips_decompression_bombs(
+        post_with_published_location, post_of_another_author, monkeypatch
+):
+    bomb = post_with_published_location
+    bomb.image = _jpeg('bomb.jpg', size=(2000, 1000))
+    bomb.save()
+    post = post_of_another_author
+    post.image = _jpeg(size=(300, 200))
+    post.save()
+    Post.objects.update(image_width=None, image_height=None)
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 500_000)
+
+    out, err = StringIO(), StringIO()
+    call_command('backfill_image_sizes', stdout=out, stderr=err)
+    assert 'Сохранено размеров: 1, ошибок: 1' in out.getvalue(), (
+        'Убедитесь, что backfill_image_sizes пропускает слишком большие'
+        ' фото и продолжает работу.'
+    )
+    assert f'Пост {bomb.id}' in err.getvalue()
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (300, 200)
+
+
+@pytest.mark.django_db
+def test_renditions_do_not_overwrite_other_originals(
+        post_with_published_location, post_of_another_author
+):
+    other = post_of_another_author
+    other.image = _jpeg('cat_card.jpg', size=(2000, 1000))
+    other.save()
+    post = post_with_published_location
+    post.image = _jpeg('cat.jpg', size=(1000, 500))
+    post.save()
+
+    with default_storage.open(other.image.name) as file:
+        assert Image.open(file).size == (2000, 1000), (
+            'Убедитесь, что копии фото не перезаписывают оригиналы'
+            ' других постов.'
+        )
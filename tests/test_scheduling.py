@@ -0,0 +1,69 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.caching import PAGE_CACHE
+from blog.models import Post
+from blog.scheduling import (
+    NEXT_PUBLICATION_KEY, next_publication_at, timeout_until_next_publication
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        Post, author=user, category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def _make_due(post):
+    '''Имитирует наступление времени публикации.'''
+    past = timezone.now() - timedelta(seconds=1)
+    Post.objects.filter(pk=post.pk).update(pub_date=past)
+    caches[PAGE_CACHE].set(NEXT_PUBLICATION_KEY, past, None)
+
+
+def test_cache_timeout_expires_at_next_publication(scheduled_post):
+    assert not scheduled_post.is_visible
+    assert next_publication_at() == scheduled_post.pub_date
+    timeout = timeout_until_next_publication(2 * 60 * 60)
+    assert 60 * 59 < timeout <= 60 * 60, (
+        'Убедитесь, что срок жизни кеша ленты истекает к ближайшей'
+        ' отложенной публикации.'
+    )
+
+
+def test_next_publication_is_shared_between_processes(scheduled_post):
+    next_publication_at()
+    assert caches[PAGE_CACHE].get(NEXT_PUBLICATION_KEY) == (
+        scheduled_post.pub_date
+    ), (
+        'Убедитесь, что время ближайшей публикации хранится в общем кеше'
+        ' страниц, а не в кеше процесса.'
+    )
+
+
+def test_feed_publishes_due_post(scheduled_post, user_client):
+    assert scheduled_post not in user_client.get('/').context['page_obj']
+    _make_due(scheduled_post)
+    assert scheduled_post in user_client.get('/').context['page_obj'], (
+        'Убедитесь, что пост появляется в ленте, когда наступает время'
+        ' публикации.'
+    )
+    assert next_publication_at() is None
+
+
+def test_publish_scheduled_command(scheduled_post):
+    _make_due(scheduled_post)
+    out = StringIO()
+    call_command('publish_scheduled', stdout=out)
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_visible
+    assert '1' in out.getvalue()
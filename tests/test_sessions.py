@@ -0,0 +1,52 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_session_cache_is_shared_between_processes():
+    assert not isinstance(caches['sessions'], LocMemCache), (
+        'Убедитесь, что по умолчанию сессии кешируются в общем для всех'
+        ' процессов кеше: иначе выход из аккаунта видит только один'
+        ' процесс.'
+    )
+
+
+def test_logged_in_requests_skip_session_table(
+        post_with_published_location, user_client
+):
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get('/')
+        assert response.status_code == 200
+        assert not any(
+            'django_session' in query['sql'] for query in queries
+        ), 'Убедитесь, что сессии читаются из кеша, а не из базы данных.'
+
+
+def test_purge_sessions_removes_only_expired():
+    now = timezone.now()
+    for number in range(5):
+        Session.objects.create(
+            session_key=f'expired{number}', session_data='',
+            expire_date=now - timedelta(days=1),
+        )
+    Session.objects.create(
+        session_key='alive', session_data='',
+        expire_date=now + timedelta(days=1),
+    )
+    out = StringIO()
+    call_command('purge_sessions', batch_size=2, stdout=out)
+    assert 'Удалено истёкших сессий: 5' in out.getvalue()
+    assert list(Session.objects.values_list('session_key', flat=True)) == [
+        'alive'
+    ]
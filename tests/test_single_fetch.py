@@ -0,0 +1,121 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _run_view(method, url, user, data=None):
+    match = resolve(url)
+    request = getattr(RequestFactory(), method)(url, data or {})
+    request.user = user
+    with CaptureQueriesContext(connection) as queries:
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    return response, [query['sql'] for query in queries]
+
+
+def _object_selects(queries, table):
+    pattern = re.compile(
+        rf'^SELECT .* FROM "{table}" WHERE "{table}"."id" = '
+    )
+    return [sql for sql in queries if pattern.match(sql)]
+
+
+def _assert_single_fetch(method, url, user, table, data=None):
+    response, queries = _run_view(method, url, user, data)
+    assert response.status_code in (200, 302), url
+    assert len(_object_selects(queries, table)) == 1, (
+        f'Убедитесь, что {method.upper()} {url} загружает объект из базы'
+        ' ровно один раз.'
+    )
+    assert not [sql for sql in queries if 'FROM "auth_user"' in sql], (
+        f'Убедитесь, что {method.upper()} {url} проверяет авторство по'
+        ' author_id, не загружая пользователя.'
+    )
+
+
+def test_post_edit_and_delete_fetch_once(
+        post_with_published_location, user
+):
+    post = post_with_published_location
+    edit_url = f'/posts/{post.id}/edit/'
+    delete_url = f'/posts/{post.id}/delete/'
+    _assert_single_fetch('get', edit_url, user, 'blog_post')
+    _assert_single_fetch('post', edit_url, user, 'blog_post', {
+        'title': 'Новый заголовок',
+        'text': 'Новый текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': post.category_id,
+    })
+    _assert_single_fetch('get', delete_url, user, 'blog_post')
+    _assert_single_fetch('post', delete_url, user, 'blog_post')
+
+
+def test_comment_edit_and_delete_fetch_once(mixer, comment_to_a_post):
+    comment = comment_to_a_post
+    author = comment.author
+    base = f'/posts/{comment.post_id}'
+    edit_url = f'{base}/edit_comment/{comment.id}/'
+    delete_url = f'{base}/delete_comment/{comment.id}/'
+    _assert_single_fetch('get', edit_url, author, 'blog_comment')
+    _assert_single_fetch(
+        'post', edit_url, author, 'blog_comment', {'text': 'Новый текст'}
+    )
+    _assert_single_fetch('get', delete_url, author, 'blog_comment')
+    _assert_single_fetch('post', delete_url, author, 'blog_comment')
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+
+
+def test_post_views_query_counts(
+        post_with_published_location, user, django_assert_num_queries
+):
+    post = post_with_published_location
+    edit_url = f'/posts/{post.id}/edit/'
+    delete_url = f'/posts/{post.id}/delete/'
+    data = {
+        'title': 'Новый заголовок',
+        'text': 'Новый текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': post.category_id,
+    }
+    views = (
+        # Пост, списки местоположений и категорий для формы.
+        ('get', edit_url, None, 3),
+        # Пост, категория из формы, прежнее состояние поста, UPDATE.
+        ('post', edit_url, data, 4),
+        ('get', delete_url, None, 1),
+        # Пост, его комментарии (их нет), прежнее состояние, DELETE.
+        ('post', delete_url, None, 4),
+    )
+    for method, url, data, expected in views:
+        with django_assert_num_queries(expected):
+            _run_view(method, url, user, data)
+
+
+def test_comment_views_query_counts(
+        comment_to_a_post, django_assert_num_queries
+):
+    comment = comment_to_a_post
+    author = comment.author
+    base = f'/posts/{comment.post_id}'
+    views = (
+        # Пост, INSERT, счётчик поста, ключ порции для перехода.
+        ('post', f'{base}/comment/', {'text': 'Ещё один'}, 4),
+        ('get', f'{base}/edit_comment/{comment.id}/', None, 1),
+        # Комментарий, UPDATE, версия поста, метки страниц поста.
+        ('post', f'{base}/edit_comment/{comment.id}/', {'text': 'Новый'}, 4),
+        ('get', f'{base}/delete_comment/{comment.id}/', None, 1),
+        # Комментарий, DELETE, счётчик поста, метки страниц поста.
+        ('post', f'{base}/delete_comment/{comment.id}/', None, 4),
+    )
+    for method, url, data, expected in views:
+        with django_assert_num_queries(expected):
+            _run_view(method, url, author, data)
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import caching
+from blog.page_cache import PAGE_CACHE, page_cache_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_stale_value_is_served_while_recomputing(settings):
+    settings.BLOG_CACHE_LOCK_WAIT = 0
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert caching.get_or_compute('answer', compute, 0) == 1
+    assert caching.acquire_lock('answer')
+    assert caching.get_or_compute('answer', compute, 0) == 1, (
+        'Пока запись пересчитывает другой запрос, должно отдаваться'
+        ' прежнее значение.'
+    )
+    caching.release_lock('answer')
+    assert caching.get_or_compute('answer', compute, 60) == 2
+    assert caching.get_or_compute('answer', compute, 60) == 2
+    assert len(calls) == 2
+
+
+def test_entry_expires_early_in_proportion_to_compute_time(monkeypatch):
+    monkeypatch.setattr(caching.random, 'random', lambda: 0.5)
+    caching.store_entry('cheap', 'value', 60, delta=0)
+    caching.store_entry('expensive', 'value', 60, delta=1000)
+    assert caching.read_entry('cheap') == ('value', True)
+    assert caching.read_entry('expensive') == ('value', False)
+
+
+def test_expired_page_is_rendered_once(
+        post_with_published_location, client, rf, settings
+):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    settings.BLOG_CACHE_LOCK_WAIT = 0
+    assert client.get('/')['X-Page-Cache'] == 'MISS'
+    key = page_cache_key(rf.get('/'), ('feed',))
+    assert caching.acquire_lock(key, PAGE_CACHE)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/')
+    assert response['X-Page-Cache'] == 'STALE'
+    assert not queries, (
+        'Устаревшая страница должна отдаваться без запросов к базе, пока'
+        ' её отрисовывает другой запрос.'
+    )
+    caching.release_lock(key, PAGE_CACHE)
+    assert client.get('/')['X-Page-Cache'] == 'MISS'
@@ -0,0 +1,97 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.uploads import CappedTemporaryFileUploadHandler
+
+pytestmark = [pytest.mark.django_db]
+
+GPS_INFO = 0x8825
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _photo(size, exif=None):
+    buffer = BytesIO()
+    image = Image.effect_noise(size, 60).convert('RGB')
+    image.save(buffer, 'JPEG', quality=98, exif=exif or Image.Exif())
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), 'image/jpeg')
+
+
+def _clean_image(upload):
+    form = PostForm(data={}, files={'image': upload})
+    form.is_valid()
+    return form
+
+
+def test_upload_is_resized_and_stripped(settings):
+    settings.BLOG_MAX_IMAGE_SIZE = (800, 800)
+    exif = Image.Exif()
+    exif[GPS_INFO] = {1: 'N'}
+    upload = _photo((1600, 1200), exif)
+    form = _clean_image(upload)
+    assert 'image' not in form.errors
+    image = form.cleaned_data['image']
+    assert image.size < upload.size, (
+        'Убедитесь, что загруженное фото пересжимается.'
+    )
+    with Image.open(image) as result:
+        assert result.size == (800, 600), (
+            'Убедитесь, что загруженное фото уменьшается до'
+            ' BLOG_MAX_IMAGE_SIZE.'
+        )
+        assert not result.getexif(), (
+            'Убедитесь, что из загруженного фото удаляются данные EXIF.'
+        )
+
+
+def test_small_upload_is_kept():
+    buffer = BytesIO()
+    Image.effect_noise((50, 50), 60).save(buffer, 'JPEG', quality=10)
+    upload = SimpleUploadedFile('small.jpg', buffer.getvalue())
+    assert _clean_image(upload).cleaned_data['image'] is upload
+
+
+def test_too_many_pixels_are_rejected(settings):
+    settings.BLOG_MAX_UPLOAD_PIXELS = 1000
+    form = _clean_image(_photo((100, 100)))
+    assert 'мегапикселей' in form.errors['image'][0]
+
+
+def test_oversize_upload_is_rejected(
+        settings, user_client, published_category
+):
+    settings.BLOG_MAX_UPLOAD_SIZE = 1000
+    response = user_client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': published_category.pk,
+        'image': _photo((200, 200)),
+    })
+    assert response.status_code == 200
+    assert 'Файл больше' in response.context['form'].errors['image'][0], (
+        'Убедитесь, что слишком большой файл отклоняется до обработки.'
+    )
+
+
+def test_oversize_upload_stops_reading_request(settings, rf):
+    settings.BLOG_MAX_UPLOAD_SIZE = 1000
+    request = rf.post('/posts/create/')
+    handler = CappedTemporaryFileUploadHandler(request)
+    handler.new_file('image', 'photo.jpg', 'image/jpeg', None)
+    handler.receive_data_chunk(b'x' * 600, 0)
+    with pytest.raises(StopUpload) as stop:
+        handler.receive_data_chunk(b'x' * 600, 600)
+    assert stop.value.connection_reset, (
+        'Убедитесь, что после превышения предела остаток запроса'
+        ' не читается.'
+    )
+    assert request.rejected_uploads == ['image']
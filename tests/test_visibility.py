@@ -0,0 +1,51 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_category_publication_propagates_to_posts(
+        many_posts_with_published_locations, published_category, client
+):
+    assert Post.objects.filter(is_visible=True).count() == len(
+        many_posts_with_published_locations
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.filter(is_visible=True).exists(), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+    assert not client.get('/').context['page_obj'].object_list
+
+    published_category.is_published = True
+    published_category.save()
+    assert Post.objects.filter(is_visible=True).count() == len(
+        many_posts_with_published_locations
+    )
+
+
+def test_deleted_category_hides_posts(
+        post_with_published_location, published_category
+):
+    published_category.delete()
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.category is None
+    assert not post_with_published_location.is_visible
+
+
+def test_location_publication_propagates_to_posts(
+        post_with_published_location, published_location
+):
+    assert post_with_published_location.location_visible
+    published_location.is_published = False
+    published_location.save()
+    post_with_published_location.refresh_from_db()
+    assert not post_with_published_location.location_visible
+
+
+def test_unpublished_post_is_not_visible(post_with_published_location):
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    post_with_published_location.refresh_from_db()
+    assert not post_with_published_location.is_visible
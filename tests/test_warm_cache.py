@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def shared_page_cache(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tmp_path / 'pages',
+        },
+    }
+
+
+def test_warm_cache_prerenders_pages(
+        post_with_published_location, user, client, settings,
+        shared_page_cache
+):
+    settings.BLOG_DONUT_CACHE = True
+    post = post_with_published_location
+    out = StringIO()
+    call_command(
+        'warm_cache', concurrency=2, username=user.username,
+        verbosity=2, stdout=out,
+    )
+    output = out.getvalue()
+    assert 'Страниц: 5, ошибок: 0' in output, output
+    assert f'/category/{post.category.slug}/' in output
+    for url in ('/', f'/posts/{post.id}/', '/pages/about/'):
+        assert client.get(url)['X-Page-Cache'] == 'HIT', (
+            f'Убедитесь, что warm_cache отрисовывает страницу {url} в кеш.'
+        )
+
+
+def test_warm_cache_refuses_process_local_cache():
+    with pytest.raises(CommandError):
+        call_command('warm_cache', stdout=StringIO())